@@ -6,8 +6,6 @@ Create Date: 2024-12-29 21:00:00.000000
 
 """
 from alembic import op
-import sqlalchemy as sa
-from sqlalchemy.dialects import postgresql
 
 # revision identifiers, used by Alembic.
 revision = '001_analytics'
@@ -17,27 +15,40 @@ depends_on = None
 
 
 def upgrade() -> None:
+    # One ALTER TABLE per table (multiple ADD COLUMN clauses), so each table is
+    # locked and its catalog entries updated once instead of once per column
     # Add columns to persona_sets table
-    op.add_column('persona_sets', sa.Column('rqe_scores', postgresql.JSON(astext_type=sa.Text()), nullable=True))
-    op.add_column('persona_sets', sa.Column('diversity_score', postgresql.JSON(astext_type=sa.Text()), nullable=True))
-    op.add_column('persona_sets', sa.Column('validation_scores', postgresql.JSON(astext_type=sa.Text()), nullable=True))
-    op.add_column('persona_sets', sa.Column('generation_cycle', sa.Integer(), nullable=True, server_default='1'))
-    op.add_column('persona_sets', sa.Column('status', sa.String(length=50), nullable=True, server_default='generated'))
+    op.execute(
+        "ALTER TABLE persona_sets "
+        "ADD COLUMN rqe_scores JSON, "
+        "ADD COLUMN diversity_score JSON, "
+        "ADD COLUMN validation_scores JSON, "
+        "ADD COLUMN generation_cycle INTEGER DEFAULT 1, "
+        "ADD COLUMN status VARCHAR(50) DEFAULT 'generated'"
+    )
     
     # Add columns to personas table
-    op.add_column('personas', sa.Column('similarity_score', postgresql.JSON(astext_type=sa.Text()), nullable=True))
-    op.add_column('personas', sa.Column('validation_status', sa.String(length=50), nullable=True))
+    op.execute(
+        "ALTER TABLE personas "
+        "ADD COLUMN similarity_score JSON, "
+        "ADD COLUMN validation_status VARCHAR(50)"
+    )
 
 
 def downgrade() -> None:
     # Remove columns from personas table
-    op.drop_column('personas', 'validation_status')
-    op.drop_column('personas', 'similarity_score')
+    op.execute(
+        "ALTER TABLE personas "
+        "DROP COLUMN validation_status, "
+        "DROP COLUMN similarity_score"
+    )
     
     # Remove columns from persona_sets table
-    op.drop_column('persona_sets', 'status')
-    op.drop_column('persona_sets', 'generation_cycle')
-    op.drop_column('persona_sets', 'validation_scores')
-    op.drop_column('persona_sets', 'diversity_score')
-    op.drop_column('persona_sets', 'rqe_scores')
-
+    op.execute(
+        "ALTER TABLE persona_sets "
+        "DROP COLUMN status, "
+        "DROP COLUMN generation_cycle, "
+        "DROP COLUMN validation_scores, "
+        "DROP COLUMN diversity_score, "
+        "DROP COLUMN rqe_scores"
+    )
@@ -18,11 +18,14 @@ depends_on = None
 def upgrade() -> None:
     # Add project_id column to documents table for session/project isolation
     op.add_column('documents', sa.Column('project_id', sa.String(length=255), nullable=True))
-    # Create index for faster filtering by project_id
-    op.create_index(op.f('ix_documents_project_id'), 'documents', ['project_id'], unique=False)
+    # Create index for faster filtering by project_id. CONCURRENTLY doesn't block
+    # writes to documents while the index builds, but can't run in a transaction
+    with op.get_context().autocommit_block():
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_documents_project_id ON documents (project_id)")
 
 
 def downgrade() -> None:
     # Remove index and column
-    op.drop_index(op.f('ix_documents_project_id'), table_name='documents')
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_documents_project_id")
     op.drop_column('documents', 'project_id')
@@ -0,0 +1,24 @@
+"""add image_prompt_hash to personas for image prompt reuse
+
+Revision ID: 003_image_prompt_hash
+Revises: 002_project_id
+Create Date: 2025-01-20 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '003_image_prompt_hash'
+down_revision = '002_project_id'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Hash of the persona_data the stored image_prompt was generated from
+    op.add_column('personas', sa.Column('image_prompt_hash', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('personas', 'image_prompt_hash')
@@ -0,0 +1,37 @@
+"""add norm_version and content_hash to personas
+
+Revision ID: 004_persona_norm_version
+Revises: 003_image_prompt_hash
+Create Date: 2025-01-20 10:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '004_persona_norm_version'
+down_revision = '003_image_prompt_hash'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Columns materialized from persona_data; backfilled by
+    # app.utils.migrate_personas_to_nested, which only scans stale norm_version rows
+    op.execute(
+        "ALTER TABLE personas "
+        "ADD COLUMN norm_version INTEGER, "
+        "ADD COLUMN content_hash VARCHAR(64)"
+    )
+    # Built CONCURRENTLY so writes to personas aren't blocked (outside the transaction)
+    with op.get_context().autocommit_block():
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_personas_norm_version ON personas (norm_version)")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_personas_norm_version")
+    op.execute(
+        "ALTER TABLE personas "
+        "DROP COLUMN content_hash, "
+        "DROP COLUMN norm_version"
+    )
@@ -0,0 +1,29 @@
+"""add composite listing index to documents
+
+Revision ID: 005_documents_listing_index
+Revises: 004_persona_norm_version
+Create Date: 2025-01-21 10:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '005_documents_listing_index'
+down_revision = '004_persona_norm_version'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Backs GET /documents (filter by project_id/document_type, newest first)
+    # Built CONCURRENTLY so writes to documents aren't blocked (outside the transaction)
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_documents_project_type_id "
+            "ON documents (project_id, document_type, id)"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_documents_project_type_id")
@@ -0,0 +1,31 @@
+"""add content_sha256 to documents
+
+Revision ID: 006_documents_content_sha256
+Revises: 005_documents_listing_index
+Create Date: 2025-01-22 10:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '006_documents_content_sha256'
+down_revision = '005_documents_listing_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # SHA-256 of the uploaded file; lets identical uploads reuse the processed document
+    op.execute("ALTER TABLE documents ADD COLUMN content_sha256 VARCHAR(64)")
+    # Built CONCURRENTLY so writes to documents aren't blocked (outside the transaction)
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_documents_content_sha256 "
+            "ON documents (content_sha256)"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_documents_content_sha256")
+    op.execute("ALTER TABLE documents DROP COLUMN content_sha256")
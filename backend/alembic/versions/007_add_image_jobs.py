@@ -0,0 +1,37 @@
+"""add image_jobs table
+
+Revision ID: 007_image_jobs
+Revises: 006_documents_content_sha256
+Create Date: 2025-01-23 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '007_image_jobs'
+down_revision = '006_documents_content_sha256'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Background image generation jobs, polled via GET /personas/{id}/images/status
+    op.create_table(
+        'image_jobs',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('persona_set_id', sa.Integer(), sa.ForeignKey('persona_sets.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('status', sa.String(50), nullable=False, server_default='queued'),
+        sa.Column('generated_count', sa.Integer(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index('ix_image_jobs_id', 'image_jobs', ['id'])
+    op.create_index('ix_image_jobs_persona_set_id', 'image_jobs', ['persona_set_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_image_jobs_persona_set_id', table_name='image_jobs')
+    op.drop_index('ix_image_jobs_id', table_name='image_jobs')
+    op.drop_table('image_jobs')
@@ -0,0 +1,24 @@
+"""add content_hash to persona_sets
+
+Revision ID: 008_persona_sets_content_hash
+Revises: 007_image_jobs
+Create Date: 2025-01-24 10:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '008_persona_sets_content_hash'
+down_revision = '007_image_jobs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Hash of the default persona JSON a set was loaded from; lets an overwrite
+    # with identical content skip rewriting the personas
+    op.execute("ALTER TABLE persona_sets ADD COLUMN content_hash VARCHAR(32)")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE persona_sets DROP COLUMN content_hash")
@@ -0,0 +1,29 @@
+"""add listing index to persona_sets
+
+Revision ID: 009_persona_sets_listing_index
+Revises: 008_persona_sets_content_hash
+Create Date: 2025-01-25 10:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '009_persona_sets_listing_index'
+down_revision = '008_persona_sets_content_hash'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Backs GET /personas/sets (ORDER BY created_at DESC, id DESC LIMIT ..., via a backward scan)
+    # Built CONCURRENTLY so writes to persona_sets aren't blocked (outside the transaction)
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_persona_sets_created_at_id "
+            "ON persona_sets (created_at, id)"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_persona_sets_created_at_id")
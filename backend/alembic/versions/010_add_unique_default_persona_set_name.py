@@ -0,0 +1,36 @@
+"""add unique name index for default persona sets
+
+Revision ID: 010_persona_sets_default_name
+Revises: 009_persona_sets_listing_index
+Create Date: 2025-01-26 10:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '010_persona_sets_default_name'
+down_revision = '009_persona_sets_listing_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Sets loaded from default persona JSON more than once keep only their oldest
+    # copy marked as loaded (the others just lose the unchanged-content shortcut)
+    op.execute("""
+        UPDATE persona_sets SET content_hash = NULL
+        WHERE content_hash IS NOT NULL AND id NOT IN (
+            SELECT min(id) FROM persona_sets WHERE content_hash IS NOT NULL GROUP BY name
+        )
+    """)
+    # Generated sets may share names, so only sets loaded from JSON are unique by name
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS uq_persona_sets_default_name "
+            "ON persona_sets (name) WHERE content_hash IS NOT NULL"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS uq_persona_sets_default_name")
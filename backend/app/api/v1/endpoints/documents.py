@@ -1,33 +1,246 @@
 """
 Document processing endpoints.
 """
-from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException, status
-from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from fastapi import APIRouter, BackgroundTasks, Depends, UploadFile, File, Form, Header, HTTPException, Query, Response, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import TypeAdapter
+from sqlalchemy import func, lambda_stmt, select
+from sqlalchemy.ext.asyncio import AsyncResult, AsyncSession
+from typing import AsyncIterator, BinaryIO, Dict, List, Optional, Tuple
+import asyncio
+import hashlib
 import os
 import uuid
 from pathlib import Path
 import aiofiles
+import aiofiles.os
 
 from app.core.database import get_db
 from app.core.config import settings
 from app.models.document import Document, DocumentType
-from app.schemas.document import DocumentProcessRequest, DocumentProcessResponse, DocumentResponse
+from app.schemas.document import (
+    DocumentProcessRequest,
+    DocumentProcessResponse,
+    DocumentResponse,
+    DocumentStatusResponse
+)
 from app.services.document_service import DocumentService
-from app.utils.file_processing import extract_text_from_file
+from app.utils.etag import etag_matches, make_etag
+from app.utils.file_processing import TEXT_EXTENSIONS, decode_text, extract_text_from_file
+from app.utils.single_flight import SingleFlight
 
-router = APIRouter()
+# orjson renders the (potentially large) document listings much faster than json.dumps
+router = APIRouter(default_response_class=ORJSONResponse)
 
 # Create uploads directory if it doesn't exist
 UPLOAD_DIR = Path("uploads")
 UPLOAD_DIR.mkdir(exist_ok=True)
 
 
+def _tmpfs_upload_dir() -> Optional[Path]:
+    """Create the RAM-backed upload directory, or return None where it isn't available."""
+    if not settings.TMPFS_UPLOAD_DIR:
+        return None
+    path = Path(settings.TMPFS_UPLOAD_DIR)
+    try:
+        path.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        return None
+    return path
+
+
+# Small uploads are only needed until their text is extracted, so they go to tmpfs
+TMPFS_UPLOAD_DIR = _tmpfs_upload_dir()
+
+# Allowed extensions as a set, plus the error message listing them, built once
+_ALLOWED_EXTENSIONS = frozenset(ext.lower() for ext in settings.ALLOWED_EXTENSIONS)
+_ALLOWED_EXTENSIONS_MSG = f"File type not allowed. Allowed types: {', '.join(settings.ALLOWED_EXTENSIONS)}"
+
+# Validates a whole page of documents in one call into pydantic-core
+_DOCUMENTS_ADAPTER = TypeAdapter(List[DocumentResponse])
+
+# Page sizes for GET /documents, and rows fetched per batch when streaming it
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+STREAM_BATCH_SIZE = 200
+
+# Uploads are copied to disk in chunks of this size
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+def _copy_spooled_upload(src: BinaryIO, file_path: Path) -> str:
+    """
+    Copy an upload that was spooled to disk using an in-kernel sendfile copy.
+    
+    Returns the SHA-256 hex digest of the upload.
+    """
+    src.flush()
+    src.seek(0)
+    digest = hashlib.file_digest(src, "sha256").hexdigest()
+    src_fd = src.fileno()
+    size = os.fstat(src_fd).st_size
+    with open(file_path, 'wb') as dst:
+        offset = 0
+        while offset < size:
+            sent = os.sendfile(dst.fileno(), src_fd, offset, size - offset)
+            if sent == 0:
+                break
+            offset += sent
+    return digest
+
+
+def _temp_upload_path(file: UploadFile) -> Path:
+    """Pick a temporary path for an upload: tmpfs for small files, UPLOAD_DIR otherwise."""
+    directory = UPLOAD_DIR
+    if (
+        TMPFS_UPLOAD_DIR is not None
+        and file.size is not None
+        and file.size <= settings.TMPFS_UPLOAD_THRESHOLD
+    ):
+        directory = TMPFS_UPLOAD_DIR
+    return directory / f"{uuid.uuid4()}_{file.filename}"
+
+
+async def _remove_upload(file_path: Path) -> None:
+    """Delete a temporary upload file if it was written."""
+    try:
+        await aiofiles.os.remove(file_path)
+    except FileNotFoundError:
+        pass
+
+
+def _check_upload_size(size: int) -> None:
+    """Raise a 400 if an upload exceeds MAX_UPLOAD_SIZE."""
+    if size > settings.MAX_UPLOAD_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"File too large. Maximum size: {settings.MAX_UPLOAD_SIZE / 1024 / 1024}MB"
+        )
+
+
+async def _stream_upload(file: UploadFile, file_path: Path) -> str:
+    """
+    Stream an upload to disk in chunks, validating the size as we go.
+    
+    Returns the SHA-256 hex digest of the upload.
+    """
+    total_size = 0
+    sha256 = hashlib.sha256()
+    async with aiofiles.open(file_path, 'wb') as f:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            total_size += len(chunk)
+            _check_upload_size(total_size)
+            sha256.update(chunk)
+            await f.write(chunk)
+    return sha256.hexdigest()
+
+
+async def _save_upload(file: UploadFile, file_path: Path) -> str:
+    """Save an upload to file_path, rejecting it if it is too large. Returns its SHA-256 hex digest."""
+    # Validate file size from the spooled upload when it is known
+    if file.size is not None:
+        _check_upload_size(file.size)
+    
+    if file.size is not None and not file._in_memory and hasattr(os, "sendfile"):
+        # The upload already spilled to a temp file; copy it without going through Python
+        return await asyncio.to_thread(_copy_spooled_upload, file.file, file_path)
+    return await _stream_upload(file, file_path)
+
+
+async def _read_upload(file: UploadFile) -> bytes:
+    """Read an upload into memory in chunks, validating the size as we go."""
+    if file.size is not None:
+        _check_upload_size(file.size)
+    
+    chunks = []
+    total_size = 0
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        total_size += len(chunk)
+        _check_upload_size(total_size)
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def _validate_extension(filename: str) -> str:
+    """Return the lowercased extension of filename, or raise a 400 if it is not allowed."""
+    # rpartition avoids building a PurePath per request; same result for allowed extensions
+    _, dot, ext = filename.rpartition('.')
+    file_ext = f".{ext.lower()}" if dot else ""
+    if file_ext not in _ALLOWED_EXTENSIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=_ALLOWED_EXTENSIONS_MSG
+        )
+    return file_ext
+
+
+async def _receive_upload(file: UploadFile, file_ext: str, file_path: Path) -> Tuple[str, Optional[bytes]]:
+    """
+    Receive an upload and return its SHA-256 hex digest.
+    
+    Plain text is kept in memory and returned alongside the digest; other
+    types are saved to file_path for their parser.
+    """
+    if file_ext in TEXT_EXTENSIONS:
+        data = await _read_upload(file)
+        return hashlib.sha256(data).hexdigest(), data
+    return await _save_upload(file, file_path), None
+
+
+async def _extract_upload_text(file_ext: str, file_path: Path, data: Optional[bytes]) -> str:
+    """Extract the text of a received upload."""
+    try:
+        if data is not None:
+            # Plain text needs no parser; decode it straight from the upload
+            return decode_text(data)
+        return await extract_text_from_file(str(file_path), file_ext)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+async def _gather_all(aws) -> list:
+    """Await all awaitables concurrently, raising the first failure only after all have finished."""
+    results = await asyncio.gather(*aws, return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return results
+
+
+# Serializes processing of identical uploads, per (content hash, type, project),
+# so only the first one does the work
+_single_flight = SingleFlight()
+
+
+async def _ndjson_documents(result: AsyncResult) -> AsyncIterator[bytes]:
+    """Serialize streamed documents as NDJSON lines."""
+    async for document in result.scalars():
+        yield DocumentResponse.model_validate(document).model_dump_json().encode() + b"\n"
+
+
+def _process_response(document: Document, processed: bool = True) -> DocumentProcessResponse:
+    """Build the response for a processed (or accepted) document."""
+    return DocumentProcessResponse(
+        id=document.id,
+        filename=document.filename,
+        document_type=document.document_type,
+        processed=processed,
+        vector_id=document.vector_id,
+        created_at=document.created_at
+    )
+
+
 @router.post("/process", response_model=DocumentProcessResponse, status_code=status.HTTP_201_CREATED)
 async def process_document(
+    background_tasks: BackgroundTasks,
+    response: Response,
     file: UploadFile = File(...),
     document_type: DocumentType = Form(...),
     project_id: str = Form(None),
+    background: bool = Form(False),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -38,99 +251,224 @@ async def process_document(
     - Processes with LLM
     - Creates embeddings and stores in vector DB
     - Saves document metadata in database
+    
+    An upload whose content was already processed for the same type and
+    project returns the existing document instead of being processed again.
+    
+    With background=true the document is saved and a 202 is returned right
+    after text extraction; LLM processing and embeddings run afterwards.
+    Poll GET /{document_id}/status to see when it is done.
     """
     # Validate file extension
-    file_ext = Path(file.filename).suffix.lower()
-    if file_ext not in settings.ALLOWED_EXTENSIONS:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"File type not allowed. Allowed types: {', '.join(settings.ALLOWED_EXTENSIONS)}"
-        )
+    file_ext = _validate_extension(file.filename)
+    
+    # Save file temporarily
+    file_path = _temp_upload_path(file)
+    
+    try:
+        content_sha256, data = await _receive_upload(file, file_ext, file_path)
+        
+        # Concurrent uploads of the same content wait here and then hit the lookup below
+        async with _single_flight((content_sha256, document_type, project_id)):
+            # Identical content was already processed; skip extraction, LLM and embeddings
+            existing = (await DocumentService.get_by_content_hashes(
+                db, [content_sha256], document_type, project_id
+            )).get(content_sha256)
+            if existing is not None:
+                response.status_code = status.HTTP_200_OK
+                return _process_response(existing, processed=existing.processed_content is not None)
+            
+            # Extract text from file based on type
+            content = await _extract_upload_text(file_ext, file_path, data)
+            
+            if background:
+                # Save the raw document now and embed it once the response has been sent
+                document = await DocumentService.create_pending(
+                    session=db,
+                    filename=file.filename,
+                    document_type=document_type,
+                    content=content,
+                    project_id=project_id,
+                    content_sha256=content_sha256
+                )
+                # get_db only commits after background tasks finish, so commit here
+                # for the task's own session to see the row
+                await db.commit()
+                background_tasks.add_task(DocumentService.finalize_embedding, document.id)
+                response.status_code = status.HTTP_202_ACCEPTED
+                return _process_response(document, processed=False)
+            
+            # Process document
+            document = await DocumentService.process_document(
+                session=db,
+                file_path=str(file_path),
+                filename=file.filename,
+                document_type=document_type,
+                content=content,
+                project_id=project_id,
+                content_sha256=content_sha256
+            )
+            # Commit before releasing the lock so waiting identical uploads find the row
+            await db.commit()
+            
+            return _process_response(document)
     
-    # Validate file size
-    file_content = await file.read()
-    if len(file_content) > settings.MAX_UPLOAD_SIZE:
+    except HTTPException:
+        raise
+    except Exception as e:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"File too large. Maximum size: {settings.MAX_UPLOAD_SIZE / 1024 / 1024}MB"
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error processing document: {str(e)}"
         )
     
-    # Save file temporarily
-    file_id = str(uuid.uuid4())
-    file_path = UPLOAD_DIR / f"{file_id}_{file.filename}"
+    finally:
+        # Clean up temporary file
+        await _remove_upload(file_path)
+
+
+@router.post("/process/batch", response_model=List[DocumentProcessResponse], status_code=status.HTTP_201_CREATED)
+async def process_documents_batch(
+    files: List[UploadFile] = File(...),
+    document_type: DocumentType = Form(...),
+    project_id: str = Form(None),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Process several documents of the same type in one request.
+    
+    - Extracts text from all files concurrently
+    - Inserts the documents with a single INSERT
+    - Creates embeddings for all chunks in one vector DB call
+    
+    Files whose content was already processed (or that repeat another file
+    in the batch) return the existing document.
+    """
+    # Validate every file before doing any work
+    file_exts = [_validate_extension(file.filename) for file in files]
+    
+    # Save files temporarily
+    file_paths = [_temp_upload_path(file) for file in files]
     
     try:
-        # Save file
-        async with aiofiles.open(file_path, 'wb') as f:
-            await f.write(file_content)
+        # Let every task finish before cleanup, then surface the first failure
+        received = await _gather_all(
+            _receive_upload(file, file_ext, file_path)
+            for file, file_ext, file_path in zip(files, file_exts, file_paths)
+        )
+        digests = [content_sha256 for content_sha256, _ in received]
+        existing = await DocumentService.get_by_content_hashes(db, digests, document_type, project_id)
         
-        # Extract text from file based on type
-        try:
-            content = await extract_text_from_file(str(file_path), file_ext)
-        except ValueError as e:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=str(e)
-            )
+        # Extract and process each new content only once
+        new_uploads: Dict[str, tuple] = {}
+        for file, file_ext, file_path, (content_sha256, data) in zip(files, file_exts, file_paths, received):
+            if content_sha256 not in existing and content_sha256 not in new_uploads:
+                new_uploads[content_sha256] = (file.filename, file_ext, file_path, data)
         
-        # Process document
-        document = await DocumentService.process_document(
+        contents = await _gather_all(
+            _extract_upload_text(file_ext, file_path, data)
+            for _, file_ext, file_path, data in new_uploads.values()
+        )
+        
+        created = await DocumentService.bulk_process(
             session=db,
-            file_path=str(file_path),
-            filename=file.filename,
+            documents=[(upload[0], content) for upload, content in zip(new_uploads.values(), contents)],
             document_type=document_type,
-            content=content,
-            project_id=project_id
+            project_id=project_id,
+            content_hashes=list(new_uploads)
         )
         
-        return DocumentProcessResponse(
-            id=document.id,
-            filename=document.filename,
-            document_type=document.document_type,
-            processed=True,
-            vector_id=document.vector_id,
-            created_at=document.created_at
-        )
+        documents = {**existing, **dict(zip(new_uploads, created))}
+        return [
+            _process_response(
+                documents[content_sha256],
+                processed=documents[content_sha256].processed_content is not None
+            )
+            for content_sha256 in digests
+        ]
     
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error processing document: {str(e)}"
+            detail=f"Error processing documents: {str(e)}"
         )
     
     finally:
-        # Clean up temporary file
-        if file_path.exists():
-            file_path.unlink()
+        # Clean up temporary files
+        await asyncio.gather(*(_remove_upload(file_path) for file_path in file_paths))
 
 
 @router.get("/", response_model=List[DocumentResponse])
 async def get_documents(
     document_type: DocumentType = None,
+    project_id: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    offset: int = Query(0, ge=0),
+    stream: bool = False,
     db: AsyncSession = Depends(get_db)
 ):
-    """Get all documents, optionally filtered by type."""
-    from sqlalchemy import select
+    """
+    Get documents (newest first), optionally filtered by type and project.
+    
+    Returns a page of at most MAX_PAGE_SIZE documents (DEFAULT_PAGE_SIZE if no
+    limit is given). With stream=true the matching documents are sent as
+    NDJSON, one per line, read from the database in batches; limit is then
+    optional and uncapped.
+    """
+    if not stream:
+        limit = min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
     
+    # lambda_stmt caches the constructed statement per code path, so neither
+    # the SELECT nor its cache key is rebuilt on every request
+    query = lambda_stmt(lambda: select(Document))
+    if project_id:
+        query += lambda s: s.where(Document.project_id == project_id)
     if document_type:
-        result = await db.execute(
-            select(Document).where(Document.document_type == document_type)
-        )
-    else:
-        result = await db.execute(select(Document))
+        query += lambda s: s.where(Document.document_type == document_type)
+    query += lambda s: s.order_by(Document.id.desc()).offset(offset)
+    if limit is not None:
+        query += lambda s: s.limit(limit)
+    
+    if stream:
+        result = await db.stream(query, execution_options={"yield_per": STREAM_BATCH_SIZE})
+        return StreamingResponse(_ndjson_documents(result), media_type="application/x-ndjson")
+    
+    result = await db.execute(query)
     
     documents = result.scalars().all()
-    return [DocumentResponse.model_validate(doc) for doc in documents]
+    return _DOCUMENTS_ADAPTER.validate_python(documents, from_attributes=True)
 
 
 @router.get("/{document_id}", response_model=DocumentResponse)
 async def get_document(
     document_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get a specific document by ID."""
+    """
+    Get a specific document by ID.
+    
+    Sends an ETag derived from the document's last modification time; a
+    matching If-None-Match gets a 304 without loading or serializing the document.
+    """
+    result = await db.execute(lambda_stmt(
+        lambda: select(func.coalesce(Document.updated_at, Document.created_at))
+        .where(Document.id == document_id)
+    ))
+    row = result.one_or_none()
+    
+    if row is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Document with ID {document_id} not found"
+        )
+    
+    etag = make_etag(document_id, row[0])
+    if if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    
     document = await DocumentService.get_document(db, document_id)
     
     if not document:
@@ -139,5 +477,31 @@ async def get_document(
             detail=f"Document with ID {document_id} not found"
         )
     
+    response.headers["ETag"] = etag
     return DocumentResponse.model_validate(document)
 
+
+@router.get("/{document_id}/status", response_model=DocumentStatusResponse)
+async def get_document_status(
+    document_id: int,
+    db: AsyncSession = Depends(get_db)
+):
+    """Get the processing status of a document."""
+    result = await db.execute(
+        select(
+            Document.id,
+            Document.filename,
+            Document.document_type,
+            Document.processed_content.is_not(None).label("processed"),
+            Document.vector_id
+        ).where(Document.id == document_id)
+    )
+    row = result.one_or_none()
+    
+    if row is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Document with ID {document_id} not found"
+        )
+    
+    return DocumentStatusResponse.model_validate(row._mapping)
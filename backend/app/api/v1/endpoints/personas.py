@@ -1,25 +1,64 @@
 """
 Persona generation and management endpoints.
 """
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, status, BackgroundTasks, Query, Response
+from fastapi.responses import StreamingResponse, ORJSONResponse
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
 from pathlib import Path
+import orjson
 
-from app.core.database import get_db
+from app.core.database import get_db, AsyncSessionLocal
 from app.schemas.persona import (
     PersonaSetCreateRequest,
     PersonaSetResponse,
     PersonaSetGenerateResponse,
     PersonaExpandResponse,
     PersonaImageResponse,
+    PersonaImageJobResponse,
     PersonaResponse,
     PersonaBasic
 )
 from app.services.persona_service import PersonaService
+from app.utils.etag import etag_matches, make_etag
+from app.utils.single_flight import SingleFlight
 from app.services.analytics_service import AnalyticsService
 
-router = APIRouter()
+# orjson renders the (deeply nested) persona_data much faster than json.dumps
+router = APIRouter(default_response_class=ORJSONResponse)
+
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+# Validates all personas of a set in one call into pydantic-core
+_PERSONAS_ADAPTER = TypeAdapter(List[PersonaResponse])
+
+# Serializes concurrent loads of the same default personas, per (set_name, file_path, persona_set_name)
+_default_load_flight = SingleFlight()
+
+# Page sizes for GET /sets
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+async def _iter_json_object(value: Dict[str, Any]) -> AsyncIterator[bytes]:
+    """
+    Encode a JSON object with orjson piece by piece.
+    
+    Top-level lists (e.g. the personas of an analytics report) are encoded one
+    item at a time, so the full document is never held as a single buffer.
+    """
+    yield b"{"
+    for i, (key, item) in enumerate(value.items()):
+        yield (b"," if i else b"") + orjson.dumps(str(key)) + b":"
+        if isinstance(item, list):
+            yield b"["
+            for j, element in enumerate(item):
+                yield (b"," if j else b"") + orjson.dumps(element, option=_ORJSON_OPTIONS)
+            yield b"]"
+        else:
+            yield orjson.dumps(item, option=_ORJSON_OPTIONS)
+    yield b"}"
 
 
 @router.post("/generate-set", response_model=PersonaSetGenerateResponse, status_code=status.HTTP_201_CREATED)
@@ -70,6 +109,58 @@ async def generate_persona_set(
         )
 
 
+@router.post("/generate-set/stream")
+async def generate_persona_set_stream(request: PersonaSetCreateRequest):
+    """
+    Step 1 (streaming): Generate a persona set and stream the LLM output as it arrives.
+    
+    The ID of the persona set being generated is returned in the X-Persona-Set-Id
+    header; the personas are stored once the stream completes and can then be
+    fetched from /sets/{persona_set_id}.
+    """
+    # The stream outlives the request handler, so it needs its own session
+    # instead of the request-scoped one from get_db.
+    session = AsyncSessionLocal()
+    try:
+        persona_set, token_stream = await PersonaService.generate_persona_set_stream(
+            session=session,
+            num_personas=request.num_personas,
+            context_details=request.context_details,
+            interview_topic=request.interview_topic,
+            user_study_design=request.user_study_design,
+            include_ethical_guardrails=request.include_ethical_guardrails,
+            output_format=request.output_format.value,
+            document_ids=request.document_ids,
+            project_id=request.project_id
+        )
+    except ValueError as e:
+        await session.close()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        await session.close()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error generating persona set: {str(e)}"
+        )
+    
+    async def stream():
+        try:
+            async for delta in token_stream:
+                yield delta
+        finally:
+            await session.close()
+    
+    media_type = "application/json" if request.output_format.value == "json" else "text/plain"
+    return StreamingResponse(
+        stream(),
+        media_type=media_type,
+        headers={"X-Persona-Set-Id": str(persona_set.id)}
+    )
+
+
 @router.post("/{persona_set_id}/expand", response_model=List[PersonaResponse])
 async def expand_personas(
     persona_set_id: int,
@@ -95,27 +186,11 @@ async def expand_personas(
                 detail=f"Persona set with ID {persona_set_id} not found"
             )
         
-        expanded_personas = []
-        for persona in persona_set.personas:
-            expanded = await PersonaService.expand_persona(db, persona.id)
-            # Return full PersonaResponse instead of just PersonaExpandResponse
-            # This ensures image_url and image_prompt are included
-            expanded_personas.append(
-                PersonaResponse(
-                    id=expanded.id,
-                    persona_set_id=expanded.persona_set_id,
-                    name=expanded.name,
-                    persona_data=expanded.persona_data,
-                    image_url=expanded.image_url,
-                    image_prompt=expanded.image_prompt,
-                    similarity_score=expanded.similarity_score,
-                    validation_status=expanded.validation_status,
-                    created_at=expanded.created_at,
-                    updated_at=expanded.updated_at
-                )
-            )
+        expanded_personas = await PersonaService.expand_personas_for_set(db, persona_set)
         
-        return expanded_personas
+        # Return full PersonaResponse instead of just PersonaExpandResponse
+        # This ensures image_url and image_prompt are included
+        return _PERSONAS_ADAPTER.validate_python(expanded_personas, from_attributes=True)
     
     except HTTPException:
         raise
@@ -126,41 +201,67 @@ async def expand_personas(
         )
 
 
-@router.post("/{persona_set_id}/generate-images", response_model=List[PersonaImageResponse])
+def _image_job_response(job) -> PersonaImageJobResponse:
+    """Build the status response of an image job."""
+    return PersonaImageJobResponse(
+        job_id=job.id,
+        persona_set_id=job.persona_set_id,
+        status=job.status,
+        generated_count=job.generated_count,
+        error=job.error,
+        created_at=job.created_at,
+        updated_at=job.updated_at
+    )
+
+
+@router.post(
+    "/{persona_set_id}/generate-images",
+    response_model=Union[List[PersonaImageResponse], PersonaImageJobResponse]
+)
 async def generate_persona_images(
     persona_set_id: int,
+    background_tasks: BackgroundTasks,
+    response: Response,
+    background: bool = Query(False, description="If True, queue the generation and return 202 with a job to poll"),
     db: AsyncSession = Depends(get_db)
 ):
     """
     Step 3: Generate images for all personas in a set.
     
     Creates AI-generated images for each persona based on their characteristics.
+    Image prompts for the whole set are generated in one batch and the images
+    are generated concurrently.
+    
+    With background=true an image job is queued and a 202 is returned right
+    away; poll GET /{persona_set_id}/images/status to see when it is done.
     """
     try:
-        persona_set = await PersonaService.get_persona_set(db, persona_set_id)
+        if background:
+            job = await PersonaService.create_image_job(db, persona_set_id)
+            # get_db only commits after background tasks finish, so commit here
+            # for the task's own session to see the job
+            await db.commit()
+            background_tasks.add_task(PersonaService.generate_all_images, persona_set_id, job.id)
+            response.status_code = status.HTTP_202_ACCEPTED
+            return _image_job_response(job)
         
-        if not persona_set:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Persona set with ID {persona_set_id} not found"
-            )
+        personas = await PersonaService.generate_persona_images_for_set(db, persona_set_id)
         
-        image_responses = []
-        for persona in persona_set.personas:
-            updated = await PersonaService.generate_persona_image(db, persona.id)
-            image_responses.append(
-                PersonaImageResponse(
-                    persona_id=updated.id,
-                    image_url=updated.image_url,
-                    image_prompt=updated.image_prompt,
-                    status="image_generated"
-                )
+        return [
+            PersonaImageResponse(
+                persona_id=persona.id,
+                image_url=persona.image_url,
+                image_prompt=persona.image_prompt,
+                status="image_generated"
             )
-        
-        return image_responses
+            for persona in personas
+        ]
     
-    except HTTPException:
-        raise
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -168,6 +269,21 @@ async def generate_persona_images(
         )
 
 
+@router.get("/{persona_set_id}/images/status", response_model=PersonaImageJobResponse)
+async def get_persona_images_status(
+    persona_set_id: int,
+    db: AsyncSession = Depends(get_db)
+):
+    """Get the status of the latest background image job of a persona set."""
+    job = await PersonaService.get_latest_image_job(db, persona_set_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No image job found for persona set {persona_set_id}"
+        )
+    return _image_job_response(job)
+
+
 @router.post("/persona/{persona_id}/generate-image", response_model=PersonaImageResponse)
 async def generate_single_persona_image(
     persona_id: int,
@@ -236,50 +352,85 @@ async def save_persona_set(
 
 @router.get("/sets", response_model=List[PersonaSetResponse])
 async def get_all_persona_sets(
+    limit: Optional[int] = Query(None, ge=1),
+    offset: int = Query(0, ge=0),
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Get all saved persona sets.
+    Get saved persona sets.
     
-    Returns all persona sets in the database, including:
+    Returns the persona sets in the database, including:
     - Generated persona sets
     - Loaded default persona sets (from JSON files)
     - Each set appears as a separate, distinct entry with its own ID, name, and personas
+    
+    Sets are ordered by created_at (newest first) so recently loaded sets appear
+    first. Returns a page of at most MAX_PAGE_SIZE sets (DEFAULT_PAGE_SIZE if no
+    limit is given).
     """
-    persona_sets = await PersonaService.get_all_persona_sets(db)
-    # Sort by created_at (newest first) so recently loaded sets appear first
-    persona_sets.sort(key=lambda x: x.created_at if x.created_at else x.id, reverse=True)
-    return [PersonaSetResponse.model_validate(ps) for ps in persona_sets]
+    return await PersonaService.get_all_persona_set_responses(
+        db, limit=min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE), offset=offset
+    )
 
 
 @router.get("/sets/{persona_set_id}", response_model=PersonaSetResponse)
 async def get_persona_set(
     persona_set_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get a specific persona set by ID."""
-    persona_set = await PersonaService.get_persona_set(db, persona_set_id)
+    """
+    Get a specific persona set by ID.
+    
+    Sends an ETag derived from the last modification of the set or its
+    personas; a matching If-None-Match gets a 304 without loading or
+    serializing the set.
+    """
+    version = await PersonaService.get_persona_set_version(db, persona_set_id)
     
-    if not persona_set:
+    if version is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Persona set with ID {persona_set_id} not found"
         )
     
-    return PersonaSetResponse.model_validate(persona_set)
+    modified_at, persona_count = version
+    etag = make_etag(persona_set_id, persona_count, modified_at)
+    if if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    
+    # Only a cached response of this version is reused; the ETag is that of the body sent
+    loaded = await PersonaService.get_persona_set_response(db, persona_set_id, version)
+    
+    if not loaded:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Persona set with ID {persona_set_id} not found"
+        )
+    
+    persona_set, (modified_at, persona_count) = loaded
+    response.headers["ETag"] = make_etag(persona_set_id, persona_count, modified_at)
+    return persona_set
 
 
 @router.get("/{persona_id}", response_model=PersonaResponse)
 async def get_persona(
     persona_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get a specific persona by ID."""
-    from sqlalchemy import select
+    """
+    Get a specific persona by ID.
+    
+    Sends an ETag derived from the persona's last modification time; a
+    matching If-None-Match gets a 304 without serializing the persona.
+    """
     from app.models.persona import Persona
     
-    result = await db.execute(select(Persona).where(Persona.id == persona_id))
-    persona = result.scalar_one_or_none()
+    # Primary-key lookup (served from the identity map if already loaded)
+    persona = await db.get(Persona, persona_id)
     
     if not persona:
         raise HTTPException(
@@ -287,6 +438,11 @@ async def get_persona(
             detail=f"Persona with ID {persona_id} not found"
         )
     
+    etag = make_etag(persona_id, persona.updated_at or persona.created_at)
+    if if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    
+    response.headers["ETag"] = etag
     return PersonaResponse.model_validate(persona)
 
 
@@ -301,6 +457,9 @@ async def load_default_personas(
     """
     Load default personas from JSON file into a persona set.
     
+    Concurrent identical requests are run one after the other, so the later
+    ones find the set the first one committed instead of racing it.
+    
     Args:
         set_name: Optional name of the persona set to load (e.g., "set1", "set2").
                   Looks for files like "default_personas_set1.json"
@@ -310,10 +469,22 @@ async def load_default_personas(
         overwrite: If True and a persona set with the same name exists, overwrite it.
                   If False (default), returns existing set if found.
     """
-    from app.utils.load_default_personas import load_default_personas, convert_persona_to_db_format, list_available_persona_sets
+    async with _default_load_flight((set_name, file_path, persona_set_name)):
+        return await _load_default_personas(set_name, file_path, persona_set_name, overwrite, db)
+
+
+async def _load_default_personas(
+    set_name: Optional[str],
+    file_path: Optional[str],
+    persona_set_name: Optional[str],
+    overwrite: bool,
+    db: AsyncSession
+) -> PersonaSetResponse:
+    """Load default personas into a persona set (see load_default_personas)."""
+    from app.utils.load_default_personas import load_default_personas, list_available_persona_sets, default_personas_hash
     from app.models.persona import PersonaSet, Persona
     from sqlalchemy.orm import selectinload
-    from sqlalchemy import select
+    from sqlalchemy import select, delete
     
     try:
         # Load personas from JSON
@@ -330,8 +501,9 @@ async def load_default_personas(
                     detail="No persona set files found. Please specify a set_name or file_path."
                 )
             
-            # Load all available sets
-            loaded_sets = []
+            # Read every available set and work out its database name first, so
+            # existing sets can be looked up with a single query
+            candidates = []
             for available_set in available_sets:
                 try:
                     set_name_to_load = available_set['name']
@@ -362,21 +534,44 @@ async def load_default_personas(
                     source_text = " | ".join(source_info)
                     final_description = f"{base_description} ({source_text})" if base_description else source_text
                     
-                    # Check if persona set already exists
-                    result = await db.execute(
-                        select(PersonaSet)
-                        .where(PersonaSet.name == final_set_name)
-                        .limit(1)
-                        .options(selectinload(PersonaSet.personas))
-                    )
-                    existing_set = result.scalar_one_or_none()
+                    candidates.append((
+                        set_name_to_load, final_set_name, final_description, personas_data,
+                        default_personas_hash(default_data)
+                    ))
+                except Exception as e:
+                    logger.warning(f"Error loading set '{available_set['name']}': {e}", exc_info=True)
+                    continue
+            
+            # Check which persona sets already exist (an existing set is only
+            # returned as-is, and so needs its personas, when not overwriting)
+            existing_query = (
+                select(PersonaSet)
+                .where(PersonaSet.name.in_({candidate[1] for candidate in candidates}))
+                # Prefer the set loaded from JSON when generated sets share its name
+                .order_by(PersonaSet.content_hash.is_(None), PersonaSet.id)
+            )
+            if not overwrite:
+                existing_query = existing_query.options(selectinload(PersonaSet.personas))
+            existing_sets = {}
+            for existing_set in (await db.execute(existing_query)).scalars():
+                existing_sets.setdefault(existing_set.name, existing_set)
+            
+            loaded_sets = []
+            for set_name_to_load, final_set_name, final_description, personas_data, content_hash in candidates:
+                try:
+                    existing_set = existing_sets.get(final_set_name)
                     
                     if existing_set:
+                        if overwrite and existing_set.description == final_description and (
+                            await PersonaService.default_set_unchanged(db, existing_set, content_hash, len(personas_data))
+                        ):
+                            # Overwriting would rewrite identical rows; return the set as-is
+                            existing_set = await PersonaService.get_persona_set(db, existing_set.id)
+                            loaded_sets.append(PersonaSetResponse.model_validate(existing_set))
+                            continue
                         if overwrite:
-                            # Delete existing personas
-                            for persona in existing_set.personas:
-                                await db.delete(persona)
-                            await db.flush()
+                            # Delete existing personas in a single statement
+                            await db.execute(delete(Persona).where(Persona.persona_set_id == existing_set.id))
                             existing_set.description = final_description
                             persona_set = existing_set
                         else:
@@ -385,38 +580,26 @@ async def load_default_personas(
                             continue
                     else:
                         # Create new persona set
-                        persona_set = PersonaSet(
-                            name=final_set_name,
-                            description=final_description,
-                            status="generated",
-                            generation_cycle=1
+                        persona_set = await PersonaService.create_default_persona_set(
+                            db, final_set_name, final_description, content_hash
                         )
-                        db.add(persona_set)
-                        await db.flush()
-                    
-                    # Create personas
-                    for persona_data in personas_data:
-                        db_persona_data = convert_persona_to_db_format(persona_data)
-                        persona = Persona(
-                            persona_set_id=persona_set.id,
-                            name=db_persona_data["name"],
-                            persona_data=db_persona_data
-                        )
-                        db.add(persona)
-                    
-                    await db.flush()
+                        if persona_set is None:
+                            # Created concurrently; return that set
+                            persona_set = await PersonaService.get_default_persona_set(db, final_set_name)
+                            existing_sets[final_set_name] = persona_set
+                            loaded_sets.append(PersonaSetResponse.model_validate(persona_set))
+                            continue
                     
-                    # Reload with relationships
-                    result = await db.execute(
-                        select(PersonaSet)
-                        .where(PersonaSet.id == persona_set.id)
-                        .options(selectinload(PersonaSet.personas))
+                    # Create personas (the set is returned without being reloaded)
+                    persona_set = await PersonaService.add_default_personas(
+                        db, persona_set, personas_data, content_hash=content_hash
                     )
-                    persona_set = result.scalar_one()
+                    # A later file with the same set name finds this set
+                    existing_sets[final_set_name] = persona_set
                     loaded_sets.append(PersonaSetResponse.model_validate(persona_set))
                     
                 except Exception as e:
-                    logger.warning(f"Error loading set '{available_set['name']}': {e}", exc_info=True)
+                    logger.warning(f"Error loading set '{set_name_to_load}': {e}", exc_info=True)
                     continue
             
             await db.commit()
@@ -472,21 +655,31 @@ async def load_default_personas(
         else:
             final_description = base_description or "Default personas loaded from JSON"
         
-        # Check if persona set with this name already exists
-        result = await db.execute(
+        # Check if persona set with this name already exists (an existing set is
+        # only returned as-is, and so needs its personas, when not overwriting)
+        existing_query = (
             select(PersonaSet)
             .where(PersonaSet.name == final_set_name)
+            # Prefer the set loaded from JSON when generated sets share its name
+            .order_by(PersonaSet.content_hash.is_(None), PersonaSet.id)
             .limit(1)
-            .options(selectinload(PersonaSet.personas))
         )
+        if not overwrite:
+            existing_query = existing_query.options(selectinload(PersonaSet.personas))
+        result = await db.execute(existing_query)
         existing_set = result.scalar_one_or_none()
+        content_hash = default_personas_hash(default_data)
         
         if existing_set:
+            if overwrite and existing_set.description == final_description and (
+                await PersonaService.default_set_unchanged(db, existing_set, content_hash, len(personas_data))
+            ):
+                # Overwriting would rewrite identical rows; return the set as-is
+                existing_set = await PersonaService.get_persona_set(db, existing_set.id)
+                return PersonaSetResponse.model_validate(existing_set)
             if overwrite:
-                # Delete existing personas
-                for persona in existing_set.personas:
-                    await db.delete(persona)
-                await db.flush()
+                # Delete existing personas in a single statement
+                await db.execute(delete(Persona).where(Persona.persona_set_id == existing_set.id))
                 # Update set metadata
                 existing_set.description = default_data.get("metadata", {}).get("context", f"Personas loaded from {set_name or 'default'}")
             else:
@@ -499,35 +692,22 @@ async def load_default_personas(
             persona_set.name = final_set_name  # Update name in case it changed
             persona_set.description = final_description
         else:
-            persona_set = PersonaSet(
-                name=final_set_name,
-                description=final_description,
-                status="generated",
-                generation_cycle=1
+            persona_set = await PersonaService.create_default_persona_set(
+                db, final_set_name, final_description, content_hash
             )
-            db.add(persona_set)
-            await db.flush()
+            if persona_set is None:
+                # Created concurrently; return that set
+                return PersonaSetResponse.model_validate(
+                    await PersonaService.get_default_persona_set(db, final_set_name)
+                )
         
-        # Create personas
-        for persona_data in personas_data:
-            db_persona_data = convert_persona_to_db_format(persona_data)
-            persona = Persona(
-                persona_set_id=persona_set.id,
-                name=db_persona_data["name"],
-                persona_data=db_persona_data
-            )
-            db.add(persona)
+        # Create personas (the set is returned without being reloaded)
+        persona_set = await PersonaService.add_default_personas(
+            db, persona_set, personas_data, content_hash=content_hash
+        )
         
         await db.commit()
         
-        # Reload with relationships
-        result = await db.execute(
-            select(PersonaSet)
-            .where(PersonaSet.id == persona_set.id)
-            .options(selectinload(PersonaSet.personas))
-        )
-        persona_set = result.scalar_one()
-        
         return PersonaSetResponse.model_validate(persona_set)
     
     except HTTPException:
@@ -641,13 +821,12 @@ async def download_personas_json(
     persona_set_id: int,
     db: AsyncSession = Depends(get_db)
 ):
-    """Download persona set as JSON."""
-    from fastapi.responses import JSONResponse
-    
+    """Download persona set as JSON (streamed as it is encoded)."""
     try:
         report = await AnalyticsService.get_analytics_report(db, persona_set_id)
-        return JSONResponse(
-            content=report,
+        return StreamingResponse(
+            _iter_json_object(report),
+            media_type="application/json",
             headers={
                 "Content-Disposition": f"attachment; filename=persona_set_{persona_set_id}.json"
             }
@@ -2,15 +2,17 @@
 Main API router for v1 endpoints.
 """
 from fastapi import APIRouter
+from fastapi.responses import ORJSONResponse
 from app.api.v1.endpoints import documents, personas, prompts, analytics
 
-api_router = APIRouter()
+# Also the response class of included routers that don't set their own
+api_router = APIRouter(default_response_class=ORJSONResponse)
 
 # Root endpoint for /api/v1
 @api_router.get("/")
 async def api_root():
     """API root endpoint."""
-    return {
+    return ORJSONResponse({
         "message": "PEP API v1",
         "version": "1.0.0",
         "endpoints": {
@@ -19,7 +21,7 @@ async def api_root():
             "prompts": "/api/v1/prompts",
             "analytics": "/api/v1/analytics"
         }
-    }
+    })
 
 api_router.include_router(documents.router, prefix="/documents", tags=["documents"])
 api_router.include_router(personas.router, prefix="/personas", tags=["personas"])
@@ -15,6 +15,11 @@ class Settings(BaseSettings):
     POSTGRES_USER: str = "pep_user"
     POSTGRES_PASSWORD: str = "pep_password"
     POSTGRES_DB: str = "pep_db"
+    DB_QUERY_CACHE_SIZE: int = 1200  # SQLAlchemy compiled statement cache size (engine-wide, shared across sessions)
+    DB_POOL_SIZE: int = 10  # Connections kept open in the pool
+    DB_MAX_OVERFLOW: int = 20  # Extra connections opened under load beyond DB_POOL_SIZE (closed when returned)
+    DB_POOL_TIMEOUT_SECONDS: int = 30  # How long a request waits for a free connection before failing
+    DB_POOL_RECYCLE_SECONDS: int = 1800  # Reconnect connections older than this (avoids server/proxy idle timeouts)
     
     # Vector Database - Pinecone (recommended)
     PINECONE_API_KEY: Optional[str] = None
@@ -25,6 +30,7 @@ class Settings(BaseSettings):
     VECTOR_DB_TYPE: str = "pinecone"  # "pinecone" or "chroma"
     CHROMA_HOST: str = "localhost"
     CHROMA_PORT: int = 8000
+    VECTOR_DB_MAX_CONCURRENCY: int = 8  # Max concurrent vector DB queries per process
     
     # OpenAI
     OPENAI_API_KEY: str
@@ -66,11 +72,26 @@ class Settings(BaseSettings):
     # File Upload
     MAX_UPLOAD_SIZE: int = 10 * 1024 * 1024  # 10MB
     ALLOWED_EXTENSIONS: List[str] = [".pdf", ".docx", ".txt", ".md"]
+    TMPFS_UPLOAD_DIR: str = "/dev/shm/pep-uploads"  # RAM-backed dir for temporary uploads ("" to always use uploads/)
+    TMPFS_UPLOAD_THRESHOLD: int = 32 * 1024 * 1024  # Uploads up to this size are written to TMPFS_UPLOAD_DIR
     
     # Document Processing
     MAX_TOKENS_PER_CHUNK: int = 20000  # Max tokens per processing chunk (leaving room for prompt)
     CHUNK_OVERLAP_TOKENS: int = 500  # Overlap between chunks
     PROCESSING_DELAY_SECONDS: float = 2.0  # Delay between chunk processing to avoid rate limits
+    IMAGE_GENERATION_CONCURRENCY: int = 5  # Max concurrent DALL-E generations/downloads per persona set
+    PERSONA_EXPANSION_CONCURRENCY: int = 5  # Max concurrent persona expansions (retrieval + LLM) per persona set
+    MAX_CONTEXT_CHARS: int = 200000  # Max characters of retrieved chunks passed to the LLM per document type
+    EXTRACTION_WORKERS: int = 0  # Processes for PDF/DOCX text extraction (0 = one per CPU)
+    
+    # Caching
+    QUERY_EMBEDDING_CACHE_SIZE: int = 4096  # Max cached query embeddings (0 disables the cache)
+    QUERY_EMBEDDING_CACHE_TTL_SECONDS: int = 3600  # How long a cached query embedding stays valid
+    VECTOR_DB_QUERY_CACHE_SIZE: int = 512  # Max cached vector DB query results (0 disables the cache)
+    VECTOR_DB_QUERY_CACHE_TTL_SECONDS: int = 300  # How long a cached vector DB query result stays valid
+    PERSONA_SET_CACHE_SIZE: int = 256  # Max cached persona set responses (0 disables the cache)
+    PERSONA_SET_CACHE_TTL_SECONDS: int = 30  # How long a cached persona set response stays valid
+    AVAILABLE_PERSONA_SETS_CACHE_TTL_SECONDS: int = 60  # How long the scanned list of default persona set files is reused
     
     class Config:
         env_file = ".env"
@@ -4,12 +4,27 @@ Database configuration and session management.
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 from app.core.config import settings
+import orjson
+
+
+def _json_serializer(value) -> str:
+    """Serialize JSON column values with orjson (much faster than stdlib json)."""
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
 
 # Create async engine
 engine = create_async_engine(
     settings.DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://"),
     echo=settings.ENVIRONMENT == "development",
     future=True,
+    query_cache_size=settings.DB_QUERY_CACHE_SIZE,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+    pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+    pool_pre_ping=True,
+    json_serializer=_json_serializer,
+    json_deserializer=orjson.loads,
 )
 
 # Create async session factory
@@ -37,3 +52,12 @@ async def get_db() -> AsyncSession:
         finally:
             await session.close()
 
+
+async def release_connection(session: AsyncSession) -> None:
+    """
+    Return a session's connection to the pool before slow external calls (LLM, DALL-E).
+    
+    Commits the current transaction; loaded objects stay usable since sessions
+    don't expire on commit, and the next query checks a connection out again.
+    """
+    await session.commit()
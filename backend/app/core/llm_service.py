@@ -5,6 +5,9 @@ from openai import AsyncOpenAI
 from langchain_openai import OpenAIEmbeddings
 from app.core.config import settings
 from app.utils.token_utils import chunk_text_by_tokens, estimate_tokens
+from app.utils.ttl_cache import TTLCache
+from app.utils.template_utils import compile_template
+from app.utils.persona_normalizer import without_normalizer_version
 from app.utils.prompts import (
     PERSONA_SET_GENERATION_SYSTEM_PROMPT,
     PERSONA_SET_GENERATION_PROMPT_TEMPLATE,
@@ -13,14 +16,21 @@ from app.utils.prompts import (
     PERSONA_EXPANSION_SYSTEM_PROMPT,
     PERSONA_EXPANSION_PROMPT_TEMPLATE
 )
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator
 import json
 import asyncio
+import hashlib
 import logging
 from openai import RateLimitError, APIError
 
 logger = logging.getLogger(__name__)
 
+# Prompt templates parsed once at import instead of on every str.format call
+_render_persona_set_prompt = compile_template(PERSONA_SET_GENERATION_PROMPT_TEMPLATE)
+_render_persona_set_interviews_only_prompt = compile_template(PERSONA_SET_GENERATION_INTERVIEWS_ONLY_TEMPLATE)
+_render_persona_set_context_only_prompt = compile_template(PERSONA_SET_GENERATION_CONTEXT_ONLY_TEMPLATE)
+_render_persona_expansion_prompt = compile_template(PERSONA_EXPANSION_PROMPT_TEMPLATE)
+
 
 class LLMService:
     """Service for interacting with OpenAI LLM."""
@@ -31,14 +41,27 @@ class LLMService:
             model=settings.OPENAI_EMBEDDING_MODEL,
             openai_api_key=settings.OPENAI_API_KEY
         )
+        # Query texts used for retrieval are highly repetitive, so their
+        # embeddings are cached to skip the embedding API round trip
+        self._query_embedding_cache = TTLCache(
+            maxsize=settings.QUERY_EMBEDDING_CACHE_SIZE,
+            ttl_seconds=settings.QUERY_EMBEDDING_CACHE_TTL_SECONDS
+        )
     
     async def create_embeddings(self, texts: List[str]) -> List[List[float]]:
         """Create embeddings for texts."""
         return await self.embeddings.aembed_documents(texts)
     
     async def create_query_embedding(self, text: str) -> List[float]:
-        """Create embedding for a single query text."""
-        return await self.embeddings.aembed_query(text)
+        """Create embedding for a single query text (cached by model and text hash)."""
+        cache_key = hashlib.sha1(
+            f"{settings.OPENAI_EMBEDDING_MODEL}\0{text}".encode("utf-8")
+        ).hexdigest()
+        embedding = self._query_embedding_cache.get(cache_key)
+        if embedding is None:
+            embedding = await self.embeddings.aembed_query(text)
+            self._query_embedding_cache.set(cache_key, embedding)
+        return embedding
     
     async def process_document(self, document_text: str, document_type: str) -> Dict[str, Any]:
         """
@@ -258,51 +281,37 @@ Provide a comprehensive and accurate response based on the context provided."""
             logger.error(f"API error completing prompt: {e}")
             raise
     
-    async def generate_persona_set(
+    async def _build_persona_set_prompt(
         self,
         interview_documents: List[str],
         context_documents: List[str],
-        num_personas: int = 3,
-        context_details: Optional[str] = None,
-        interview_topic: Optional[str] = None,
-        user_study_design: Optional[str] = None,
-        include_ethical_guardrails: bool = True,
-        output_format: str = "json",
-        has_interviews: bool = True,
-        has_context: bool = True
-    ) -> Dict[str, Any]:
-        """
-        Generate initial persona set with advanced configuration options.
-        
-        Args:
-            interview_documents: List of interview document texts
-            context_documents: List of context document texts
-            num_personas: Number of personas to generate
-            context_details: Additional context about research/market/domain
-            interview_topic: What the interviews are about
-            user_study_design: Description of user study design and methodology
-            include_ethical_guardrails: Whether to include ethical considerations
-            output_format: Format for persona output (json, profile, chat, etc.)
-            has_interviews: Whether interview documents are available
-            has_context: Whether context documents are available
-        """
+        num_personas: int,
+        context_details: Optional[str],
+        interview_topic: Optional[str],
+        user_study_design: Optional[str],
+        include_ethical_guardrails: bool,
+        output_format: str,
+        has_interviews: bool,
+        has_context: bool
+    ) -> str:
+        """Build the user prompt for persona set generation (shared by the blocking and streaming paths)."""
         # Determine which prompt template to use based on available data
         if has_interviews and has_context:
             # Both interviews and context available - use standard template
             context = "\n\n".join(context_documents) if context_documents else ""
             interviews = "\n\n".join([f"Interview {i+1}:\n{interview}" for i, interview in enumerate(interview_documents)])
-            prompt_template = PERSONA_SET_GENERATION_PROMPT_TEMPLATE
+            render_prompt = _render_persona_set_prompt
             full_text = f"Context Information:\n{context}\n\nInterview Data:\n{interviews}"
         elif has_interviews and not has_context:
             # Only interviews available
             interviews = "\n\n".join([f"Interview {i+1}:\n{interview}" for i, interview in enumerate(interview_documents)])
-            prompt_template = PERSONA_SET_GENERATION_INTERVIEWS_ONLY_TEMPLATE
+            render_prompt = _render_persona_set_interviews_only_prompt
             context = ""  # Empty for template
             full_text = f"Interview Data:\n{interviews}"
         elif has_context and not has_interviews:
             # Only context available
             context = "\n\n".join(context_documents) if context_documents else ""
-            prompt_template = PERSONA_SET_GENERATION_CONTEXT_ONLY_TEMPLATE
+            render_prompt = _render_persona_set_context_only_prompt
             interviews = ""  # Empty for template
             full_text = f"Context Information:\n{context}"
         else:
@@ -366,7 +375,7 @@ Please ensure personas are:
 - Balanced in representation across different user segments"""
         
         # Use appropriate prompt template based on available data
-        prompt = prompt_template.format(
+        return render_prompt(
             num_personas=num_personas,
             context=context,
             interviews=interviews,
@@ -376,6 +385,47 @@ Please ensure personas are:
             format_instructions=format_instructions,
             ethical_guardrails_section=ethical_guardrails_section
         )
+    
+    async def generate_persona_set(
+        self,
+        interview_documents: List[str],
+        context_documents: List[str],
+        num_personas: int = 3,
+        context_details: Optional[str] = None,
+        interview_topic: Optional[str] = None,
+        user_study_design: Optional[str] = None,
+        include_ethical_guardrails: bool = True,
+        output_format: str = "json",
+        has_interviews: bool = True,
+        has_context: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Generate initial persona set with advanced configuration options.
+        
+        Args:
+            interview_documents: List of interview document texts
+            context_documents: List of context document texts
+            num_personas: Number of personas to generate
+            context_details: Additional context about research/market/domain
+            interview_topic: What the interviews are about
+            user_study_design: Description of user study design and methodology
+            include_ethical_guardrails: Whether to include ethical considerations
+            output_format: Format for persona output (json, profile, chat, etc.)
+            has_interviews: Whether interview documents are available
+            has_context: Whether context documents are available
+        """
+        prompt = await self._build_persona_set_prompt(
+            interview_documents=interview_documents,
+            context_documents=context_documents,
+            num_personas=num_personas,
+            context_details=context_details,
+            interview_topic=interview_topic,
+            user_study_design=user_study_design,
+            include_ethical_guardrails=include_ethical_guardrails,
+            output_format=output_format,
+            has_interviews=has_interviews,
+            has_context=has_context
+        )
         
         try:
             # Determine response format based on output_format
@@ -391,21 +441,80 @@ Please ensure personas are:
                 temperature=0.8
             )
             
-            # Parse response based on format
-            if output_format == "json":
-                return json.loads(response.choices[0].message.content)
-            else:
-                # For non-JSON formats, return content in "personas" field for consistency
-                # The content will be the formatted text from LLM
-                return {
-                    "personas": response.choices[0].message.content,
-                    "format": output_format,
-                    "description": f"Personas generated in {output_format} format"
-                }
+            return self.parse_persona_set_content(response.choices[0].message.content, output_format)
         except Exception as e:
             logger.error(f"Error generating persona set: {e}")
             raise
     
+    async def generate_persona_set_stream(
+        self,
+        interview_documents: List[str],
+        context_documents: List[str],
+        num_personas: int = 3,
+        context_details: Optional[str] = None,
+        interview_topic: Optional[str] = None,
+        user_study_design: Optional[str] = None,
+        include_ethical_guardrails: bool = True,
+        output_format: str = "json",
+        has_interviews: bool = True,
+        has_context: bool = True
+    ) -> AsyncIterator[str]:
+        """
+        Stream persona set generation token-by-token.
+        
+        Takes the same arguments as generate_persona_set, but yields content deltas
+        as soon as the model produces them. Callers accumulate the deltas and pass
+        the full text to parse_persona_set_content once the stream is exhausted.
+        """
+        prompt = await self._build_persona_set_prompt(
+            interview_documents=interview_documents,
+            context_documents=context_documents,
+            num_personas=num_personas,
+            context_details=context_details,
+            interview_topic=interview_topic,
+            user_study_design=user_study_design,
+            include_ethical_guardrails=include_ethical_guardrails,
+            output_format=output_format,
+            has_interviews=has_interviews,
+            has_context=has_context
+        )
+        
+        try:
+            response_format = {"type": "json_object"} if output_format == "json" else None
+            
+            stream = await self.client.chat.completions.create(
+                model=settings.OPENAI_MODEL,
+                messages=[
+                    {"role": "system", "content": PERSONA_SET_GENERATION_SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt}
+                ],
+                response_format=response_format,
+                temperature=0.8,
+                stream=True
+            )
+            
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    yield delta
+        except Exception as e:
+            logger.error(f"Error streaming persona set: {e}")
+            raise
+    
+    def parse_persona_set_content(self, content: str, output_format: str) -> Dict[str, Any]:
+        """Parse the raw LLM output of a persona set generation into a persona set dict."""
+        if output_format == "json":
+            return json.loads(content)
+        # For non-JSON formats, return content in "personas" field for consistency
+        # The content will be the formatted text from LLM
+        return {
+            "personas": content,
+            "format": output_format,
+            "description": f"Personas generated in {output_format} format"
+        }
+    
     def _get_format_instructions(self, output_format: str, num_personas: int) -> str:
         """Get format-specific instructions for persona generation."""
         format_guides = {
@@ -514,7 +623,7 @@ Format as personas that can be used in interactive scenarios or simulations."""
         """Expand a basic persona into a full-fledged persona."""
         # Combine context and check size
         context = "\n\n".join(context_documents)
-        persona_str = json.dumps(persona_basic, indent=2)
+        persona_str = json.dumps(without_normalizer_version(persona_basic), indent=2)
         
         full_text = f"Context Information:\n{context}\n\nBasic Persona:\n{persona_str}"
         estimated_tokens = estimate_tokens(full_text)
@@ -532,7 +641,7 @@ Format as personas that can be used in interactive scenarios or simulations."""
             context = "\n\n".join(summarized_contexts)
         
         # Use customizable prompt template
-        prompt = PERSONA_EXPANSION_PROMPT_TEMPLATE.format(
+        prompt = _render_persona_expansion_prompt(
             context=context,
             persona_basic=persona_str
         )
@@ -548,16 +657,52 @@ Format as personas that can be used in interactive scenarios or simulations."""
                 temperature=0.7
             )
             
+            # Prompt cache telemetry: the instructions + context prefix is shared
+            # between calls, so repeated expansions should report cached tokens
+            usage = getattr(response, "usage", None)
+            prompt_details = getattr(usage, "prompt_tokens_details", None)
+            if usage is not None:
+                context_version = hashlib.sha1(context.encode("utf-8")).hexdigest()[:12]
+                logger.info(
+                    f"Persona expansion used {usage.prompt_tokens} prompt tokens "
+                    f"({getattr(prompt_details, 'cached_tokens', 0) or 0} cached, context {context_version})"
+                )
+            
             return json.loads(response.choices[0].message.content)
         except Exception as e:
             logger.error(f"Error expanding persona: {e}")
             raise
     
+    async def expand_personas_batch(
+        self,
+        personas_basic: List[Dict[str, Any]],
+        context_documents: List[List[str]],
+        max_concurrency: int = 5
+    ) -> List[Any]:
+        """
+        Expand several personas, sending their requests as one client-side batch.
+        
+        Chat completions has no multi-prompt endpoint (and the Batch API is
+        asynchronous with up to a 24h window), so all prompts are issued together
+        with at most max_concurrency in flight. Results are returned in input
+        order; a failed expansion is returned as its exception.
+        """
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        
+        async def expand(persona_basic: Dict[str, Any], contexts: List[str]) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.expand_persona(persona_basic, contexts)
+        
+        return await asyncio.gather(
+            *[expand(persona, contexts) for persona, contexts in zip(personas_basic, context_documents)],
+            return_exceptions=True
+        )
+    
     async def generate_persona_image_prompt(self, persona: Dict[str, Any]) -> str:
         """Generate an image prompt for a persona."""
         prompt = f"""Create a detailed image generation prompt for this persona:
 
-{json.dumps(persona, indent=2)}
+{json.dumps(without_normalizer_version(persona), indent=2)}
 
 Generate a descriptive prompt that captures:
 - Physical appearance
@@ -578,6 +723,56 @@ Return only the image prompt text, no JSON."""
         
         return response.choices[0].message.content
     
+    async def generate_persona_image_prompts_batch(self, personas: List[Dict[str, Any]]) -> List[str]:
+        """
+        Generate image prompts for several personas with a single LLM request.
+        
+        The personas are keyed by their position and the model returns the prompts
+        under the same keys. Any persona the batch response misses falls back to
+        generate_persona_image_prompt.
+        """
+        if not personas:
+            return []
+        if len(personas) == 1:
+            return [await self.generate_persona_image_prompt(personas[0])]
+        
+        keyed_personas = {str(i): without_normalizer_version(persona) for i, persona in enumerate(personas)}
+        prompt = f"""Create a detailed image generation prompt for each of these personas (keyed by ID):
+
+{json.dumps(keyed_personas, indent=2)}
+
+For each persona, generate a descriptive prompt that captures:
+- Physical appearance
+- Setting/environment
+- Style and mood
+- Professional context if relevant
+
+Return a JSON object of the form {{"prompts": {{"<persona ID>": "<image prompt text>"}}}} with one entry per persona ID."""
+        
+        prompts: Dict[str, Any] = {}
+        try:
+            response = await self.client.chat.completions.create(
+                model=settings.OPENAI_MODEL,
+                messages=[
+                    {"role": "system", "content": "You create detailed image generation prompts."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.8,
+                response_format={"type": "json_object"}
+            )
+            prompts = json.loads(response.choices[0].message.content).get("prompts", {})
+        except (json.JSONDecodeError, AttributeError) as e:
+            logger.warning(f"Could not parse batched image prompts, generating individually: {e}")
+        
+        results = []
+        for key, persona in keyed_personas.items():
+            image_prompt = prompts.get(key) if isinstance(prompts, dict) else None
+            if not isinstance(image_prompt, str) or not image_prompt.strip():
+                image_prompt = await self.generate_persona_image_prompt(persona)
+            results.append(image_prompt)
+        
+        return results
+    
     async def generate_image(self, prompt: str, size: str = "1024x1024") -> str:
         """Generate an image using DALL-E."""
         response = await self.client.images.generate(
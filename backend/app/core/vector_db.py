@@ -3,7 +3,10 @@ Vector database abstraction layer.
 Supports both Pinecone (recommended) and ChromaDB (for local development).
 """
 from app.core.config import settings
+from app.utils.ttl_cache import TTLCache
 from typing import List, Optional, Dict, Any
+import asyncio
+import json
 import logging
 
 logger = logging.getLogger(__name__)
@@ -18,8 +21,13 @@ else:
     import chromadb
     from chromadb.config import Settings as ChromaSettings
     from chromadb.utils import embedding_functions
+    from app.core.llm_service import llm_service
     import uuid
     
+    # Bounds concurrent queries; the ChromaDB HTTP client is synchronous, so
+    # queries run in worker threads and this gate keeps them from piling up
+    _query_semaphore = asyncio.Semaphore(settings.VECTOR_DB_MAX_CONCURRENCY)
+    
     class ChromaVectorDB:
         """ChromaDB client wrapper."""
         
@@ -101,11 +109,24 @@ else:
             query_texts: List[str],
             n_results: int = 5,
             collection_name: str = "persona_documents",
-            filter_metadata: Optional[dict] = None
+            filter_metadata: Optional[dict] = None,
+            query_embeddings: Optional[List[List[float]]] = None
         ):
-            """Query similar documents from the vector database."""
+            """
+            Query similar documents from the vector database.
+            
+            When the collection embeds with OpenAI, query embeddings are taken from
+            the LLM service cache instead of being recomputed by ChromaDB per query.
+            """
             collection = self.get_or_create_collection(collection_name)
             
+            if query_embeddings is None and isinstance(
+                self._embedding_function, embedding_functions.OpenAIEmbeddingFunction
+            ):
+                query_embeddings = [
+                    await llm_service.create_query_embedding(text) for text in query_texts
+                ]
+            
             # Convert filter format for ChromaDB
             where = None
             if filter_metadata:
@@ -118,11 +139,21 @@ else:
                     else:
                         where[key] = value
             
-            results = collection.query(
-                query_texts=query_texts,
-                n_results=n_results,
-                where=where
-            )
+            async with _query_semaphore:
+                if query_embeddings is not None:
+                    results = await asyncio.to_thread(
+                        collection.query,
+                        query_embeddings=query_embeddings,
+                        n_results=n_results,
+                        where=where
+                    )
+                else:
+                    results = await asyncio.to_thread(
+                        collection.query,
+                        query_texts=query_texts,
+                        n_results=n_results,
+                        where=where
+                    )
             
             return results
         
@@ -179,6 +210,67 @@ else:
     logger.info("Using ChromaDB as vector database")
 
 
+class CachedVectorDB:
+    """
+    Wrapper caching query results (documents, ids, metadatas) of a vector DB client.
+    
+    Cached results are dropped whenever documents are added or their metadata is
+    updated through this instance; the TTL bounds staleness for changes made by
+    other processes.
+    """
+    
+    def __init__(self, impl):
+        self._impl = impl
+        self._query_cache = TTLCache(
+            maxsize=settings.VECTOR_DB_QUERY_CACHE_SIZE,
+            ttl_seconds=settings.VECTOR_DB_QUERY_CACHE_TTL_SECONDS
+        )
+    
+    def __getattr__(self, name):
+        return getattr(self._impl, name)
+    
+    async def add_documents(self, *args, **kwargs):
+        """Add documents and invalidate cached query results."""
+        try:
+            return await self._impl.add_documents(*args, **kwargs)
+        finally:
+            self._query_cache.clear()
+    
+    async def update_document_metadata(self, *args, **kwargs) -> bool:
+        """Update vector metadata and invalidate cached query results."""
+        try:
+            return await self._impl.update_document_metadata(*args, **kwargs)
+        finally:
+            self._query_cache.clear()
+    
+    async def query_documents(
+        self,
+        query_texts: List[str],
+        n_results: int = 5,
+        collection_name: str = "persona_documents",
+        filter_metadata: Optional[dict] = None,
+        query_embeddings: Optional[List[List[float]]] = None
+    ) -> Dict[str, Any]:
+        """Query similar documents, serving repeated queries from the cache."""
+        cache_key = (
+            collection_name,
+            tuple(query_texts),
+            n_results,
+            json.dumps(filter_metadata, sort_keys=True, default=str)
+        )
+        results = self._query_cache.get(cache_key)
+        if results is None:
+            results = await self._impl.query_documents(
+                query_texts=query_texts,
+                n_results=n_results,
+                collection_name=collection_name,
+                filter_metadata=filter_metadata,
+                query_embeddings=query_embeddings
+            )
+            self._query_cache.set(cache_key, results)
+        return results
+
+
 # Global vector DB instance (Pinecone or ChromaDB based on config)
-vector_db = _vector_db_impl
+vector_db = CachedVectorDB(_vector_db_impl)
 
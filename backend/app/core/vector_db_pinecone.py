@@ -5,11 +5,16 @@ from pinecone import Pinecone, ServerlessSpec
 from app.core.config import settings
 from app.core.llm_service import llm_service
 from typing import List, Optional, Dict, Any
+import asyncio
 import uuid
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Bounds concurrent queries; the Pinecone client is synchronous, so queries
+# run in worker threads and this gate keeps them from piling up
+_query_semaphore = asyncio.Semaphore(settings.VECTOR_DB_MAX_CONCURRENCY)
+
 
 class PineconeVectorDB:
     """Pinecone vector database client wrapper."""
@@ -159,7 +164,8 @@ class PineconeVectorDB:
         query_texts: List[str],
         n_results: int = 5,
         collection_name: str = "persona_documents",
-        filter_metadata: Optional[dict] = None
+        filter_metadata: Optional[dict] = None,
+        query_embeddings: Optional[List[List[float]]] = None
     ) -> Dict[str, Any]:
         """
         Query similar documents from Pinecone.
@@ -169,15 +175,19 @@ class PineconeVectorDB:
             n_results: Number of results to return
             collection_name: Not used (kept for API compatibility)
             filter_metadata: Metadata filter (Pinecone filter format)
+            query_embeddings: Optional pre-computed embeddings for query_texts
         
         Returns:
             Dictionary with 'documents' and 'metadatas' keys
         """
-        if not query_texts:
+        if not query_texts and not query_embeddings:
             return {"documents": [], "metadatas": []}
         
-        # Generate query embedding (async)
-        query_embedding = await llm_service.create_query_embedding(query_texts[0])
+        # Use the pre-computed embedding or generate it (cached by LLM service)
+        if query_embeddings:
+            query_embedding = query_embeddings[0]
+        else:
+            query_embedding = await llm_service.create_query_embedding(query_texts[0])
         
         # Build filter if provided
         filter_dict = None
@@ -193,12 +203,14 @@ class PineconeVectorDB:
                     filter_dict[key] = {"$eq": value}
         
         # Query Pinecone
-        query_response = self.index.query(
-            vector=query_embedding,
-            top_k=n_results,
-            include_metadata=True,
-            filter=filter_dict
-        )
+        async with _query_semaphore:
+            query_response = await asyncio.to_thread(
+                self.index.query,
+                vector=query_embedding,
+                top_k=n_results,
+                include_metadata=True,
+                filter=filter_dict
+            )
         
         # Format response to match ChromaDB format
         documents = []
@@ -1,8 +1,9 @@
 """
 Main FastAPI application entry point.
 """
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
 from pathlib import Path
@@ -47,6 +48,18 @@ async def lifespan(app: FastAPI):
                                    WHERE table_name='persona_sets' AND column_name='status') THEN
                         ALTER TABLE persona_sets ADD COLUMN status VARCHAR(50) DEFAULT 'generated';
                     END IF;
+                    IF NOT EXISTS (SELECT 1 FROM information_schema.columns 
+                                   WHERE table_name='persona_sets' AND column_name='content_hash') THEN
+                        ALTER TABLE persona_sets ADD COLUMN content_hash VARCHAR(32);
+                    END IF;
+                    CREATE INDEX IF NOT EXISTS ix_persona_sets_created_at_id ON persona_sets(created_at, id);
+                    IF NOT EXISTS (SELECT 1 FROM pg_indexes WHERE indexname='uq_persona_sets_default_name') THEN
+                        UPDATE persona_sets SET content_hash = NULL
+                        WHERE content_hash IS NOT NULL AND id NOT IN (
+                            SELECT min(id) FROM persona_sets WHERE content_hash IS NOT NULL GROUP BY name
+                        );
+                        CREATE UNIQUE INDEX uq_persona_sets_default_name ON persona_sets(name) WHERE content_hash IS NOT NULL;
+                    END IF;
                 END $$;
             """))
             await conn.execute(text("""
@@ -60,6 +73,19 @@ async def lifespan(app: FastAPI):
                                    WHERE table_name='personas' AND column_name='validation_status') THEN
                         ALTER TABLE personas ADD COLUMN validation_status VARCHAR(50);
                     END IF;
+                    IF NOT EXISTS (SELECT 1 FROM information_schema.columns 
+                                   WHERE table_name='personas' AND column_name='image_prompt_hash') THEN
+                        ALTER TABLE personas ADD COLUMN image_prompt_hash VARCHAR(64);
+                    END IF;
+                    IF NOT EXISTS (SELECT 1 FROM information_schema.columns 
+                                   WHERE table_name='personas' AND column_name='norm_version') THEN
+                        ALTER TABLE personas ADD COLUMN norm_version INTEGER;
+                        CREATE INDEX IF NOT EXISTS ix_personas_norm_version ON personas(norm_version);
+                    END IF;
+                    IF NOT EXISTS (SELECT 1 FROM information_schema.columns 
+                                   WHERE table_name='personas' AND column_name='content_hash') THEN
+                        ALTER TABLE personas ADD COLUMN content_hash VARCHAR(64);
+                    END IF;
                 END $$;
             """))
             await conn.execute(text("""
@@ -70,6 +96,12 @@ async def lifespan(app: FastAPI):
                         ALTER TABLE documents ADD COLUMN project_id VARCHAR(255);
                         CREATE INDEX IF NOT EXISTS ix_documents_project_id ON documents(project_id);
                     END IF;
+                    IF NOT EXISTS (SELECT 1 FROM information_schema.columns 
+                                   WHERE table_name='documents' AND column_name='content_sha256') THEN
+                        ALTER TABLE documents ADD COLUMN content_sha256 VARCHAR(64);
+                        CREATE INDEX IF NOT EXISTS ix_documents_content_sha256 ON documents(content_sha256);
+                    END IF;
+                    CREATE INDEX IF NOT EXISTS ix_documents_project_type_id ON documents(project_id, document_type, id);
                 END $$;
             """))
         except Exception as e:
@@ -91,6 +123,7 @@ async def lifespan(app: FastAPI):
     # Load default personas if they don't exist
     from app.utils.load_default_personas import load_default_personas, convert_persona_to_db_format
     from app.models.persona import PersonaSet, Persona
+    from app.utils.persona_data import persona_data_columns
     from sqlalchemy import select
     
     async with AsyncSessionLocal() as session:
@@ -123,7 +156,7 @@ async def lifespan(app: FastAPI):
                         persona = Persona(
                             persona_set_id=persona_set.id,
                             name=db_persona_data["name"],
-                            persona_data=db_persona_data
+                            **persona_data_columns(db_persona_data)
                         )
                         session.add(persona)
                     
@@ -139,7 +172,10 @@ async def lifespan(app: FastAPI):
     
     yield
     # Shutdown
-    pass
+    from app.utils.image_utils import close_http_client
+    await close_http_client()
+    from app.utils.file_processing import shutdown_extraction_pool
+    shutdown_extraction_pool()
 
 
 app = FastAPI(
@@ -147,6 +183,7 @@ app = FastAPI(
     description="Automatic persona generator from unstructured data",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # CORS middleware
@@ -159,6 +196,28 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Reject oversized document uploads from the Content-Length header, before the
+# multipart body is read. The endpoint still enforces MAX_UPLOAD_SIZE on the
+# bytes it receives, which covers chunked requests without a Content-Length.
+UPLOAD_PATH = "/api/v1/documents/process"
+UPLOAD_MULTIPART_OVERHEAD = 64 * 1024  # Boundaries and form fields around the file
+
+
+@app.middleware("http")
+async def limit_upload_size(request: Request, call_next):
+    """Return 413 for uploads whose declared size exceeds MAX_UPLOAD_SIZE."""
+    if request.method == "POST" and request.url.path == UPLOAD_PATH:
+        content_length = request.headers.get("content-length")
+        if content_length and content_length.isdigit() and (
+            int(content_length) > settings.MAX_UPLOAD_SIZE + UPLOAD_MULTIPART_OVERHEAD
+        ):
+            return JSONResponse(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                content={"detail": f"File too large. Maximum size: {settings.MAX_UPLOAD_SIZE / 1024 / 1024}MB"}
+            )
+    return await call_next(request)
+
+
 # Include API routes
 app.include_router(api_router, prefix="/api/v1")
 
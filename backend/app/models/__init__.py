@@ -1,5 +1,5 @@
 # Database models
 from app.models.document import Document, DocumentType
-from app.models.persona import PersonaSet, Persona
+from app.models.persona import PersonaSet, Persona, ImageJob
 
-__all__ = ["Document", "DocumentType", "PersonaSet", "Persona"]
+__all__ = ["Document", "DocumentType", "PersonaSet", "Persona", "ImageJob"]
@@ -1,7 +1,7 @@
 """
 Document model for storing processed documents.
 """
-from sqlalchemy import Column, Integer, String, Text, DateTime, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index, Enum as SQLEnum
 from sqlalchemy.sql import func
 from app.core.database import Base
 import enum
@@ -24,6 +24,12 @@ class Document(Base):
     processed_content = Column(Text, nullable=True)  # LLM processed summary
     vector_id = Column(String(255), nullable=True)  # ID in vector DB
     project_id = Column(String(255), nullable=True, index=True)  # Optional project/session identifier for isolation
+    content_sha256 = Column(String(64), nullable=True, index=True)  # SHA-256 of the uploaded file, for deduplication
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    __table_args__ = (
+        # Serves the filtered, newest-first document listing
+        Index("ix_documents_project_type_id", "project_id", "document_type", "id"),
+    )
 
@@ -1,7 +1,7 @@
 """
 Persona models for storing generated personas.
 """
-from sqlalchemy import Column, Integer, String, Text, JSON, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, JSON, DateTime, ForeignKey, Index, text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -10,6 +10,15 @@ from app.core.database import Base
 class PersonaSet(Base):
     """Persona set model - collection of personas."""
     __tablename__ = "persona_sets"
+    __table_args__ = (
+        # Backs GET /personas/sets (newest first, paginated)
+        Index("ix_persona_sets_created_at_id", "created_at", "id"),
+        # Sets loaded from default persona JSON (content_hash set) are unique by name
+        Index(
+            "uq_persona_sets_default_name", "name",
+            unique=True, postgresql_where=text("content_hash IS NOT NULL")
+        ),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False)
@@ -20,6 +29,7 @@ class PersonaSet(Base):
     validation_scores = Column(JSON, nullable=True)  # Validation scores: [{"persona_id": 1, "similarity": 0.92}, ...]
     generation_cycle = Column(Integer, default=1)  # Current generation cycle
     status = Column(String(50), default="generated")  # generated, expanded, validated
+    content_hash = Column(String(32), nullable=True)  # Hash of the default persona JSON the set was loaded from (see default_personas_hash)
     personas = relationship("Persona", back_populates="persona_set", cascade="all, delete-orphan")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -33,8 +43,11 @@ class Persona(Base):
     persona_set_id = Column(Integer, ForeignKey("persona_sets.id"), nullable=False)
     name = Column(String(255), nullable=False)
     persona_data = Column(JSON, nullable=False)  # Full persona JSON
+    norm_version = Column(Integer, nullable=True, index=True)  # Normalizer version persona_data was last normalized/checked with
+    content_hash = Column(String(64), nullable=True)  # Hash of persona_data (see persona_data_hash)
     image_url = Column(String(500), nullable=True)
     image_prompt = Column(Text, nullable=True)
+    image_prompt_hash = Column(String(64), nullable=True)  # Hash of the persona_data the image_prompt was generated from
     # Validation metrics
     similarity_score = Column(JSON, nullable=True)  # Cosine similarity scores with transcripts
     validation_status = Column(String(50), nullable=True)  # validated, pending, failed
@@ -43,3 +56,15 @@ class Persona(Base):
     
     persona_set = relationship("PersonaSet", back_populates="personas")
 
+
+class ImageJob(Base):
+    """Background image generation job for a persona set."""
+    __tablename__ = "image_jobs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    persona_set_id = Column(Integer, ForeignKey("persona_sets.id", ondelete="CASCADE"), nullable=False, index=True)
+    status = Column(String(50), nullable=False, default="queued")  # queued, running, completed, failed
+    generated_count = Column(Integer, nullable=True)  # Personas whose image was generated
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -26,6 +26,15 @@ class DocumentProcessResponse(BaseModel):
         from_attributes = True
 
 
+class DocumentStatusResponse(BaseModel):
+    """Processing status of a document accepted for background processing."""
+    id: int
+    filename: str
+    document_type: DocumentType
+    processed: bool
+    vector_id: Optional[str] = None
+
+
 class DocumentResponse(BaseModel):
     """Document response schema."""
     id: int
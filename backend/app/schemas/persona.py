@@ -126,6 +126,17 @@ class PersonaImageResponse(BaseModel):
     status: str = "image_generated"
 
 
+class PersonaImageJobResponse(BaseModel):
+    """Status of a background image generation job for a persona set."""
+    job_id: int
+    persona_set_id: int
+    status: str  # queued, running, completed, failed
+    generated_count: Optional[int] = None
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
 class PromptCompleteRequest(BaseModel):
     """Request to complete a prompt."""
     prompt: str = Field(..., description="User prompt to complete")
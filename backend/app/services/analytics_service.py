@@ -2,7 +2,7 @@
 Analytics service for persona diversity, validation, and metrics.
 """
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, exists
 from typing import List, Dict, Any, Optional
 import logging
 
@@ -136,14 +136,14 @@ class AnalyticsService:
         if not persona_set.personas:
             raise ValueError("Persona set has no personas")
         
-        # Get interview documents
+        # Check for interview documents (their content is not needed here)
         interview_result = await session.execute(
-            select(Document).where(Document.document_type == DocumentType.INTERVIEW)
+            select(exists().where(Document.document_type == DocumentType.INTERVIEW))
         )
-        interviews = list(interview_result.scalars().all())
+        has_interviews = interview_result.scalar()
         
         # If no interview documents, use dummy validation
-        use_dummy_validation = not interviews
+        use_dummy_validation = not has_interviews
         
         if use_dummy_validation:
             logger.info("No interview documents found. Using dummy validation scores.")
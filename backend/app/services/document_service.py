@@ -2,12 +2,14 @@
 Document processing service.
 """
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from typing import List, Optional
+from sqlalchemy import insert, lambda_stmt, select
+from typing import Dict, List, Optional, Tuple
 import aiofiles
+import asyncio
 import os
 import logging
 
+from app.core.database import AsyncSessionLocal
 from app.models.document import Document, DocumentType
 from app.core.llm_service import llm_service
 from app.core.vector_db import vector_db
@@ -26,25 +28,12 @@ class DocumentService:
         filename: str,
         document_type: DocumentType,
         content: str,
-        project_id: Optional[str] = None
+        project_id: Optional[str] = None,
+        content_sha256: Optional[str] = None
     ) -> Document:
         """Process a document: extract text, process with LLM, create embeddings."""
         
-        # Process with LLM (skip if content is too short or if it's a default document)
-        # For default documents, skip LLM processing to avoid API calls and errors
-        if len(content) > 100 and not filename.startswith("default_") and not filename.startswith("transcripts-"):
-            try:
-                # Try to use process_large_document if available, otherwise use process_document
-                if hasattr(llm_service, 'process_large_document'):
-                    processed_data = await llm_service.process_large_document(content, document_type.value)
-                else:
-                    processed_data = await llm_service.process_document(content, document_type.value)
-                processed_content = str(processed_data)
-            except Exception as e:
-                logger.warning(f"LLM processing failed, using raw content: {e}")
-                processed_content = content
-        else:
-            processed_content = content
+        processed_content = await DocumentService._process_content(content, filename, document_type)
         
         # Store document in database first to get the document ID
         # This allows us to include document_id in vector metadata for filtering
@@ -53,7 +42,8 @@ class DocumentService:
             document_type=document_type,
             content=content,
             processed_content=processed_content,
-            project_id=project_id  # Store project_id for session isolation
+            project_id=project_id,  # Store project_id for session isolation
+            content_sha256=content_sha256
         )
         
         session.add(document)
@@ -61,29 +51,72 @@ class DocumentService:
         await session.refresh(document)
         
         # Create embeddings and store in vector DB with document_id in metadata
-        vector_ids = []
+        await DocumentService._store_embeddings(session, document)
+        
+        return document
+    
+    @staticmethod
+    async def create_pending(
+        session: AsyncSession,
+        filename: str,
+        document_type: DocumentType,
+        content: str,
+        project_id: Optional[str] = None,
+        content_sha256: Optional[str] = None
+    ) -> Document:
+        """
+        Store a document without LLM processing or embeddings.
+        
+        processed_content stays NULL until finalize_embedding has run.
+        """
+        document = Document(
+            filename=filename,
+            document_type=document_type,
+            content=content,
+            processed_content=None,
+            project_id=project_id,
+            content_sha256=content_sha256
+        )
+        
+        session.add(document)
+        await session.flush()
+        await session.refresh(document)
+        return document
+    
+    @staticmethod
+    async def finalize_embedding(document_id: int) -> None:
+        """Run the LLM and embedding steps for a pending document in its own session."""
+        try:
+            async with AsyncSessionLocal() as session:
+                document = await session.get(Document, document_id)
+                if document is None:
+                    logger.warning(f"Document {document_id} no longer exists, skipping finalization")
+                    return
+                
+                document.processed_content = await DocumentService._process_content(
+                    document.content, document.filename, document.document_type
+                )
+                await DocumentService._store_embeddings(session, document)
+                await session.commit()
+        except Exception as e:
+            logger.error(f"Error finalizing document {document_id}: {e}")
+    
+    @staticmethod
+    async def _store_embeddings(session: AsyncSession, document: Document) -> None:
+        """Chunk a document, store the chunks in the vector DB and record the first vector ID."""
         try:
             # Use token-aware chunking for better embeddings
             from app.utils.token_utils import chunk_text_by_tokens
             
             # Chunk by tokens (better for embeddings) - use smaller chunks for embeddings
             chunks = chunk_text_by_tokens(
-                content,
+                document.content,
                 max_tokens=8000,  # Smaller chunks for embeddings (embedding models handle this well)
                 overlap_tokens=200
             )
             
             # Prepare metadata with document_id for filtering and isolation
-            metadatas = [
-                {
-                    "document_type": document_type.value,
-                    "filename": filename,
-                    "document_id": str(document.id),  # Store document_id for filtering
-                    "chunk_index": i,
-                    "text_content": chunk  # Store chunk content for Pinecone
-                }
-                for i in range(len(chunks))
-            ]
+            metadatas = DocumentService._chunk_metadatas(document, chunks)
             
             # Store in vector DB (Pinecone or ChromaDB will create embeddings)
             vector_ids = await vector_db.add_documents(
@@ -95,10 +128,132 @@ class DocumentService:
             document.vector_id = vector_ids[0] if vector_ids else None
             await session.flush()
         except Exception as e:
-            logger.warning(f"Vector DB storage failed for {filename}, continuing without vector storage: {e}")
+            logger.warning(f"Vector DB storage failed for {document.filename}, continuing without vector storage: {e}")
             # Continue without vector storage - document will still be saved in database
+    
+    @staticmethod
+    async def bulk_process(
+        session: AsyncSession,
+        documents: List[Tuple[str, str]],
+        document_type: DocumentType,
+        project_id: Optional[str] = None,
+        content_hashes: Optional[List[str]] = None
+    ) -> List[Document]:
+        """
+        Process several (filename, content) documents of the same type.
         
-        return document
+        The LLM step runs concurrently, the rows are inserted with a single
+        multi-row INSERT and all chunks are embedded and stored in one vector DB call.
+        """
+        if not documents:
+            return []
+        
+        processed_contents = await asyncio.gather(*(
+            DocumentService._process_content(content, filename, document_type)
+            for filename, content in documents
+        ))
+        
+        rows = [
+            {
+                "filename": filename,
+                "document_type": document_type,
+                "content": content,
+                "processed_content": processed_content,
+                "project_id": project_id,
+                "content_sha256": content_sha256
+            }
+            for (filename, content), processed_content, content_sha256 in zip(
+                documents, processed_contents, content_hashes or [None] * len(documents)
+            )
+        ]
+        result = await session.scalars(
+            insert(Document).returning(Document, sort_by_parameter_order=True),
+            rows
+        )
+        created = list(result.all())
+        
+        try:
+            from app.utils.token_utils import chunk_text_by_tokens
+            
+            all_chunks = []
+            all_metadatas = []
+            chunk_counts = []
+            for document in created:
+                chunks = chunk_text_by_tokens(document.content, max_tokens=8000, overlap_tokens=200)
+                all_chunks.extend(chunks)
+                all_metadatas.extend(DocumentService._chunk_metadatas(document, chunks))
+                chunk_counts.append(len(chunks))
+            
+            vector_ids = await vector_db.add_documents(
+                documents=all_chunks,
+                metadatas=all_metadatas
+            )
+            
+            # Point each document at the first vector of its own chunks
+            offset = 0
+            for document, count in zip(created, chunk_counts):
+                document.vector_id = vector_ids[offset] if count and offset < len(vector_ids) else None
+                offset += count
+            await session.flush()
+        except Exception as e:
+            logger.warning(f"Vector DB storage failed for batch of {len(created)} documents, continuing without vector storage: {e}")
+        
+        return created
+    
+    @staticmethod
+    async def _process_content(content: str, filename: str, document_type: DocumentType) -> str:
+        """Summarize document content with the LLM, falling back to the raw content."""
+        # Process with LLM (skip if content is too short or if it's a default document)
+        # For default documents, skip LLM processing to avoid API calls and errors
+        if len(content) > 100 and not filename.startswith("default_") and not filename.startswith("transcripts-"):
+            try:
+                # Try to use process_large_document if available, otherwise use process_document
+                if hasattr(llm_service, 'process_large_document'):
+                    processed_data = await llm_service.process_large_document(content, document_type.value)
+                else:
+                    processed_data = await llm_service.process_document(content, document_type.value)
+                return str(processed_data)
+            except Exception as e:
+                logger.warning(f"LLM processing failed, using raw content: {e}")
+        return content
+    
+    @staticmethod
+    def _chunk_metadatas(document: Document, chunks: List[str]) -> List[dict]:
+        """Build vector DB metadata for a document's chunks."""
+        return [
+            {
+                "document_type": document.document_type.value,
+                "filename": document.filename,
+                "document_id": str(document.id),  # Store document_id for filtering
+                "chunk_index": i,
+                "text_content": chunk  # Store chunk content for Pinecone
+            }
+            for i, chunk in enumerate(chunks)
+        ]
+    
+    @staticmethod
+    async def get_by_content_hashes(
+        session: AsyncSession,
+        content_hashes: List[str],
+        document_type: DocumentType,
+        project_id: Optional[str] = None
+    ) -> Dict[str, Document]:
+        """Get already stored documents of a type/project keyed by the SHA-256 of their upload."""
+        if not content_hashes:
+            return {}
+        
+        query = select(Document).where(
+            Document.content_sha256.in_(set(content_hashes)),
+            Document.document_type == document_type,
+            Document.project_id == project_id if project_id else Document.project_id.is_(None)
+        ).order_by(Document.id)
+        result = await session.execute(query)
+        
+        # Keep the oldest document for each hash
+        documents: Dict[str, Document] = {}
+        for document in result.scalars():
+            documents.setdefault(document.content_sha256, document)
+        return documents
     
     @staticmethod
     async def get_documents_by_type(
@@ -118,7 +273,7 @@ class DocumentService:
     ) -> Optional[Document]:
         """Get a document by ID."""
         result = await session.execute(
-            select(Document).where(Document.id == document_id)
+            lambda_stmt(lambda: select(Document).where(Document.id == document_id))
         )
         return result.scalar_one_or_none()
     
@@ -2,20 +2,95 @@
 Persona generation and management service.
 """
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from typing import List, Optional, Dict, Any
+from sqlalchemy import select, insert, update, bindparam, func, event, inspect
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from typing import List, Optional, Dict, Any, Tuple, AsyncIterator
+from datetime import datetime
+from pydantic import TypeAdapter
+from itertools import chain
 
-from app.models.persona import PersonaSet, Persona
+from app.models.persona import PersonaSet, Persona, ImageJob
 from app.models.document import Document, DocumentType
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, release_connection
 from app.core.llm_service import llm_service
 from app.core.vector_db import vector_db
-from app.schemas.persona import PersonaBasic
+from app.schemas.persona import PersonaBasic, PersonaSetResponse
 from app.utils.persona_normalizer import normalize_persona_to_nested
+from app.utils.load_default_personas import convert_persona_to_db_format
+from app.utils.persona_data import persona_data_hash, persona_data_columns
+from app.utils.image_utils import download_and_save_image, ensure_images_dir
+from app.utils.ttl_cache import TTLCache
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+# Read-only persona set responses served by the GET endpoints, keyed by id (as
+# (version, response) pairs, see get_persona_set_version), plus the list of all
+# set ids. Both are cleared when a session that wrote personas or persona sets
+# commits; the TTL bounds staleness across worker processes.
+_persona_set_response_cache = TTLCache(
+    maxsize=settings.PERSONA_SET_CACHE_SIZE,
+    ttl_seconds=settings.PERSONA_SET_CACHE_TTL_SECONDS
+)
+_persona_set_ids_cache = TTLCache(
+    maxsize=64 if settings.PERSONA_SET_CACHE_SIZE > 0 else 0,
+    ttl_seconds=settings.PERSONA_SET_CACHE_TTL_SECONDS
+)
+_PERSONA_SETS_CHANGED = "persona_sets_changed"
+
+
+@event.listens_for(Session, "after_flush")
+def _track_persona_set_flush(session, flush_context):
+    """Flag sessions that flushed changes to personas or persona sets."""
+    changed = chain(session.new, session.dirty, session.deleted)
+    if any(isinstance(obj, (Persona, PersonaSet)) for obj in changed):
+        session.info[_PERSONA_SETS_CHANGED] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_persona_set_dml(orm_execute_state):
+    """Flag sessions that ran bulk INSERT/UPDATE/DELETE statements (which bypass the flush) on personas."""
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and mapper.class_ in (Persona, PersonaSet):
+        orm_execute_state.session.info[_PERSONA_SETS_CHANGED] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_persona_set_cache(session):
+    """Drop cached persona set responses once persona changes are committed."""
+    if session.info.pop(_PERSONA_SETS_CHANGED, False):
+        _persona_set_response_cache.clear()
+        _persona_set_ids_cache.clear()
+
+
+@event.listens_for(Session, "after_rollback")
+def _reset_persona_set_tracking(session):
+    """Rolled back changes never became visible, so keep the cache."""
+    session.info.pop(_PERSONA_SETS_CHANGED, None)
+
+
+# Frequently used statements, built once so their compiled form is reused
+# from the engine's compiled cache across requests
+_SELECT_PERSONA_BY_ID = select(Persona).where(Persona.id == bindparam("persona_id"))
+_SELECT_PERSONA_SET_BY_ID = select(PersonaSet).where(PersonaSet.id == bindparam("persona_set_id"))
+_SELECT_PERSONA_SET_WITH_PERSONAS_BY_ID = (
+    select(PersonaSet)
+    .where(PersonaSet.id == bindparam("persona_set_id"))
+    .options(selectinload(PersonaSet.personas))
+)
+_PERSONA_SETS_NEWEST_FIRST = (PersonaSet.created_at.desc(), PersonaSet.id.desc())
+
+# Validates a whole list of loaded persona sets in one pydantic-core pass
+_PERSONA_SET_LIST_ADAPTER = TypeAdapter(List[PersonaSetResponse])
+
+
 class PersonaService:
     """Service for persona generation and management."""
     
@@ -41,37 +116,205 @@ class PersonaService:
             document_ids: Optional list of document IDs to filter by (for session isolation)
             project_id: Optional project ID to filter documents by project
         """
+        interview_texts, context_texts = await PersonaService._retrieve_generation_documents(
+            session, document_ids=document_ids, project_id=project_id
+        )
+        await release_connection(session)
+        
+        # Determine generation mode based on available documents
+        has_interviews = len(interview_texts) > 0
+        has_context = len(context_texts) > 0
+        
+        # Generate persona set using LLM with retrieved chunks and advanced options
+        persona_set_data = await llm_service.generate_persona_set(
+            interview_documents=interview_texts if has_interviews else [],
+            context_documents=context_texts if has_context else [],
+            num_personas=num_personas,
+            context_details=context_details,
+            interview_topic=interview_topic,
+            user_study_design=user_study_design,
+            include_ethical_guardrails=include_ethical_guardrails,
+            output_format=output_format,
+            has_interviews=has_interviews,
+            has_context=has_context
+        )
+        
+        # Create persona set; RETURNING gives us the row (and its ID) without a flush
+        persona_set = await session.scalar(
+            insert(PersonaSet)
+            .values(
+                name=await PersonaService._next_persona_set_name(session),
+                description=persona_set_data.get("description", "Generated persona set"),
+                status="generated",
+                generation_cycle=1
+            )
+            .returning(PersonaSet)
+        )
+        
+        personas = await PersonaService._add_personas(session, persona_set, persona_set_data, output_format, num_personas)
+        
+        # Populate the relationship with the returned rows instead of re-selecting them
+        set_committed_value(persona_set, "personas", personas)
+        
+        return persona_set
+    
+    @staticmethod
+    async def generate_persona_set_stream(
+        session: AsyncSession,
+        num_personas: int = 3,
+        context_details: Optional[str] = None,
+        interview_topic: Optional[str] = None,
+        user_study_design: Optional[str] = None,
+        include_ethical_guardrails: bool = True,
+        output_format: str = "json",
+        document_ids: Optional[List[int]] = None,
+        project_id: Optional[str] = None
+    ) -> Tuple[PersonaSet, AsyncIterator[str]]:
+        """
+        Generate a persona set while streaming the LLM output as it is produced.
+        
+        Retrieval runs eagerly so missing documents still surface as a ValueError
+        before any output is sent. The persona set is committed up front with status
+        "generating" so its ID is known immediately; the returned iterator yields the
+        raw completion tokens and, once the completion is finished, parses it, stores
+        the personas and marks the set as "generated" (or "failed" on error).
+        
+        Returns:
+            Tuple of (persona_set, token_iterator)
+        """
+        interview_texts, context_texts = await PersonaService._retrieve_generation_documents(
+            session, document_ids=document_ids, project_id=project_id
+        )
+        
+        has_interviews = len(interview_texts) > 0
+        has_context = len(context_texts) > 0
+        
+        persona_set = PersonaSet(
+            name=await PersonaService._next_persona_set_name(session),
+            description="Persona set generation in progress",
+            status="generating",
+            generation_cycle=1
+        )
+        session.add(persona_set)
+        await session.commit()
+        
+        token_stream = llm_service.generate_persona_set_stream(
+            interview_documents=interview_texts if has_interviews else [],
+            context_documents=context_texts if has_context else [],
+            num_personas=num_personas,
+            context_details=context_details,
+            interview_topic=interview_topic,
+            user_study_design=user_study_design,
+            include_ethical_guardrails=include_ethical_guardrails,
+            output_format=output_format,
+            has_interviews=has_interviews,
+            has_context=has_context
+        )
+        
+        async def mark_failed() -> None:
+            await session.rollback()
+            persona_set.status = "failed"
+            await session.commit()
+        
+        async def stream_and_store() -> AsyncIterator[str]:
+            parts: List[str] = []
+            try:
+                async for delta in token_stream:
+                    parts.append(delta)
+                    yield delta
+                
+                persona_set_data = llm_service.parse_persona_set_content("".join(parts), output_format)
+                persona_set.description = persona_set_data.get("description", "Generated persona set")
+                persona_set.status = "generated"
+                await PersonaService._add_personas(session, persona_set, persona_set_data, output_format, num_personas)
+                await session.commit()
+            except BaseException as exc:
+                # Also covers client disconnects (CancelledError / GeneratorExit),
+                # so the set never stays "generating"
+                if isinstance(exc, Exception):
+                    logger.exception(f"Streaming generation failed for persona set {persona_set.id}")
+                else:
+                    logger.warning(f"Streaming generation interrupted for persona set {persona_set.id}")
+                await asyncio.shield(mark_failed())
+                raise
+        
+        return persona_set, stream_and_store()
+    
+    @staticmethod
+    async def _retrieve_generation_documents(
+        session: AsyncSession,
+        document_ids: Optional[List[int]] = None,
+        project_id: Optional[str] = None
+    ) -> Tuple[List[str], List[str]]:
+        """
+        Retrieve interview and context chunks for persona set generation using RAG.
+        
+        Documents without chunks in the vector DB (embedding still pending or
+        failed) contribute their full content instead, within MAX_CONTEXT_CHARS
+        per document type.
+        
+        Returns:
+            Tuple of (interview_texts, context_texts)
+        
+        Raises:
+            ValueError: If no interview or context documents exist for the given filter,
+                or retrieval finds nothing although all of them are embedded
+        """
         # Build query filter for documents
-        document_query = select(Document)
+        document_filter = []
         
         # Filter by document_ids if provided (for session isolation)
         if document_ids:
-            document_query = document_query.where(Document.id.in_(document_ids))
+            document_filter.append(Document.id.in_(document_ids))
         # Or filter by project_id if provided
         elif project_id:
-            document_query = document_query.where(Document.project_id == project_id)
+            document_filter.append(Document.project_id == project_id)
         
-        # Check if we have any interview documents
-        interview_query = document_query.where(Document.document_type == DocumentType.INTERVIEW)
-        interview_result = await session.execute(interview_query)
-        interviews = list(interview_result.scalars().all())
+        interview_filter_db = [*document_filter, Document.document_type == DocumentType.INTERVIEW]
+        context_filter_db = [*document_filter, Document.document_type == DocumentType.CONTEXT]
         
-        # Check if we have any context documents
-        context_query_db = document_query.where(Document.document_type == DocumentType.CONTEXT)
-        context_result = await session.execute(context_query_db)
-        contexts = list(context_result.scalars().all())
+        # Find which document types exist (and, when filtering, their IDs), and
+        # which have documents without chunks, in a single query without loading
+        # any document content
+        document_types = [DocumentType.INTERVIEW, DocumentType.CONTEXT]
+        doc_ids_by_type: Dict[DocumentType, List[str]] = {doc_type: [] for doc_type in document_types}
+        unembedded_types = set()
+        if document_filter:
+            type_result = await session.execute(
+                select(Document.document_type, Document.id, Document.vector_id.is_(None))
+                .where(*document_filter, Document.document_type.in_(document_types))
+            )
+            for doc_type, doc_id, unembedded in type_result:
+                doc_ids_by_type[doc_type].append(str(doc_id))
+                if unembedded:
+                    unembedded_types.add(doc_type)
+            has_interviews = bool(doc_ids_by_type[DocumentType.INTERVIEW])
+            has_contexts = bool(doc_ids_by_type[DocumentType.CONTEXT])
+        else:
+            type_result = await session.execute(
+                select(Document.document_type, Document.vector_id.is_(None))
+                .where(Document.document_type.in_(document_types))
+                .distinct()
+            )
+            present_types = set()
+            for doc_type, unembedded in type_result:
+                present_types.add(doc_type)
+                if unembedded:
+                    unembedded_types.add(doc_type)
+            has_interviews = DocumentType.INTERVIEW in present_types
+            has_contexts = DocumentType.CONTEXT in present_types
         
         # Validate that we have at least one type of document
-        if not interviews and not contexts:
+        if not has_interviews and not has_contexts:
             raise ValueError("No documents found. Please process at least one interview or context document first.")
         
         interview_texts = []
         context_texts = []
         
         # Process interviews if available
-        if interviews:
+        if has_interviews:
             # Get interview document IDs for vector DB filtering
-            interview_doc_ids = [str(doc.id) for doc in interviews] if document_ids or project_id else None
+            interview_doc_ids = doc_ids_by_type[DocumentType.INTERVIEW] if document_filter else None
             
             # Use RAG to retrieve relevant chunks for persona generation
             interview_query_text = "user interviews, user research, interview transcripts, user feedback, user needs"
@@ -89,21 +332,26 @@ class PersonaService:
                 filter_metadata=interview_filter
             )
             
-            # Extract document texts from vector DB results
-            if interview_results.get("documents") and len(interview_results["documents"]) > 0:
-                # Flatten the results (ChromaDB returns lists of lists)
-                for doc_list in interview_results["documents"]:
-                    interview_texts.extend(doc_list)
+            # Extract unique document texts from vector DB results
+            interview_texts = PersonaService._unique_chunk_texts(interview_results)
             
-            # If no results from vector DB, fall back to full documents (for backward compatibility)
-            if not interview_texts:
-                logger.warning("No interview chunks found in vector DB, falling back to full documents")
-                interview_texts = [interview.content for interview in interviews]
+            # Documents without chunks (not embedded yet, or embedding failed) are used in full
+            if DocumentType.INTERVIEW in unembedded_types:
+                logger.info("Some interview documents have no chunks in the vector DB, adding their full content")
+                interview_texts += await PersonaService._unembedded_document_contents(
+                    session, interview_filter_db,
+                    settings.MAX_CONTEXT_CHARS - sum(len(text) for text in interview_texts)
+                )
+            elif not interview_texts:
+                raise ValueError(
+                    "No indexed chunks found for the selected interview documents. "
+                    "Please re-process them before generating personas."
+                )
         
         # Process context if available
-        if contexts:
+        if has_contexts:
             context_query_text = "research context, background information, market research, user behavior, demographics"
-            context_doc_ids = [str(doc.id) for doc in contexts] if document_ids or project_id else None
+            context_doc_ids = doc_ids_by_type[DocumentType.CONTEXT] if document_filter else None
             
             context_filter = {"document_type": "context"}
             if context_doc_ids and len(context_doc_ids) > 0:
@@ -119,47 +367,139 @@ class PersonaService:
                 filter_metadata=context_filter
             )
             
-            # Extract document texts from vector DB results
-            if context_results.get("documents") and len(context_results["documents"]) > 0:
-                for doc_list in context_results["documents"]:
-                    context_texts.extend(doc_list)
+            # Extract unique document texts from vector DB results
+            context_texts = PersonaService._unique_chunk_texts(context_results)
             
-            # If no results from vector DB, fall back to full documents
-            if not context_texts:
-                logger.warning("No context chunks found in vector DB, falling back to full documents")
-                context_texts = [context.content for context in contexts]
+            # Documents without chunks (not embedded yet, or embedding failed) are used in full
+            if DocumentType.CONTEXT in unembedded_types:
+                logger.info("Some context documents have no chunks in the vector DB, adding their full content")
+                context_texts += await PersonaService._unembedded_document_contents(
+                    session, context_filter_db,
+                    settings.MAX_CONTEXT_CHARS - sum(len(text) for text in context_texts)
+                )
+            elif not context_texts:
+                raise ValueError(
+                    "No indexed chunks found for the selected context documents. "
+                    "Please re-process them before generating personas."
+                )
         
         logger.info(f"Using {len(interview_texts)} interview chunks and {len(context_texts)} context chunks for persona generation")
         
-        # Determine generation mode based on available documents
-        has_interviews = len(interview_texts) > 0
-        has_context = len(context_texts) > 0
+        return interview_texts, context_texts
+    
+    @staticmethod
+    async def _unembedded_document_contents(
+        session: AsyncSession,
+        document_filter: List[Any],
+        max_chars: int
+    ) -> List[str]:
+        """
+        Full content of the documents matching a filter that have no chunks in the
+        vector DB (vector_id is NULL), in ID order and truncated to max_chars in total.
+        """
+        if max_chars <= 0:
+            logger.info("No room left in the context for documents without chunks")
+            return []
         
-        # Generate persona set using LLM with retrieved chunks and advanced options
-        persona_set_data = await llm_service.generate_persona_set(
-            interview_documents=interview_texts if has_interviews else [],
-            context_documents=context_texts if has_context else [],
-            num_personas=num_personas,
-            context_details=context_details,
-            interview_topic=interview_topic,
-            user_study_design=user_study_design,
-            include_ethical_guardrails=include_ethical_guardrails,
-            output_format=output_format,
-            has_interviews=has_interviews,
-            has_context=has_context
+        result = await session.execute(
+            select(func.substr(Document.content, 1, max_chars))
+            .where(*document_filter, Document.vector_id.is_(None))
+            .order_by(Document.id)
         )
+        texts = []
+        total_chars = 0
+        for content in result.scalars():
+            remaining = max_chars - total_chars
+            if len(content) > remaining:
+                if remaining > 0:
+                    texts.append(content[:remaining])
+                logger.info(f"Documents without chunks truncated to {max_chars} characters")
+                break
+            texts.append(content)
+            total_chars += len(content)
         
-        # Create persona set
-        persona_set = PersonaSet(
-            name=f"Persona Set {len(await PersonaService._get_all_persona_sets(session)) + 1}",
-            description=persona_set_data.get("description", "Generated persona set"),
-            status="generated",
-            generation_cycle=1
-        )
-        session.add(persona_set)
-        await session.flush()
+        return texts
+    
+    @staticmethod
+    def _flatten_query_results(results: Dict[str, Any]) -> List[Tuple[str, str, Dict[str, Any]]]:
+        """
+        Flatten vector DB query results into (chunk_id, text, metadata) triples in rank order.
         
-        # Create basic personas
+        Results are lists of lists (one list per query text); chunks without an ID
+        are keyed by their text.
+        """
+        documents = results.get("documents") or []
+        ids = results.get("ids") or []
+        metadatas = results.get("metadatas") or []
+        
+        chunks = []
+        for query_index, doc_list in enumerate(documents):
+            id_list = ids[query_index] if query_index < len(ids) else []
+            metadata_list = (metadatas[query_index] if query_index < len(metadatas) else None) or []
+            for chunk_index, text in enumerate(doc_list):
+                if not text:
+                    continue
+                chunk_id = id_list[chunk_index] if chunk_index < len(id_list) else text
+                metadata = (metadata_list[chunk_index] if chunk_index < len(metadata_list) else None) or {}
+                chunks.append((chunk_id, text, metadata))
+        
+        return chunks
+    
+    @staticmethod
+    def _unique_chunks(
+        results: Dict[str, Any],
+        max_chars: Optional[int] = None
+    ) -> List[Tuple[str, str, Dict[str, Any]]]:
+        """
+        De-duplicate and size-bound vector DB query results.
+        
+        Chunks are de-duplicated by vector ID and kept in rank order until
+        max_chars (defaults to settings.MAX_CONTEXT_CHARS) is reached; the chunk
+        that crosses the limit is truncated so the top-ranked content always fits.
+        
+        Returns:
+            List of (chunk_id, text, metadata) triples
+        """
+        max_chars = settings.MAX_CONTEXT_CHARS if max_chars is None else max_chars
+        
+        chunks = []
+        seen = set()
+        total_chars = 0
+        for chunk_id, text, metadata in PersonaService._flatten_query_results(results):
+            if chunk_id in seen:
+                continue
+            seen.add(chunk_id)
+            
+            remaining = max_chars - total_chars
+            if len(text) > remaining:
+                if remaining > 0:
+                    chunks.append((chunk_id, text[:remaining], metadata))
+                logger.info(f"Retrieved chunks truncated to {max_chars} characters")
+                break
+            chunks.append((chunk_id, text, metadata))
+            total_chars += len(text)
+        
+        return chunks
+    
+    @staticmethod
+    def _unique_chunk_texts(results: Dict[str, Any], max_chars: Optional[int] = None) -> List[str]:
+        """Texts of the de-duplicated, size-bounded chunks (see _unique_chunks)."""
+        return [text for _, text, _ in PersonaService._unique_chunks(results, max_chars)]
+    
+    @staticmethod
+    async def _add_personas(
+        session: AsyncSession,
+        persona_set: PersonaSet,
+        persona_set_data: Dict[str, Any],
+        output_format: str,
+        num_personas: int
+    ) -> List[Persona]:
+        """
+        Insert the personas of an LLM-generated persona set with a single bulk INSERT.
+        
+        Returns:
+            The inserted personas (loaded via RETURNING)
+        """
         # Handle different output formats
         if output_format == "json":
             personas_data = persona_set_data.get("personas", [])
@@ -167,22 +507,22 @@ class PersonaService:
                 # If personas is not a list, try to extract it
                 personas_data = [personas_data] if personas_data else []
             
+            rows = []
             for persona_data in personas_data:
                 if isinstance(persona_data, dict):
                     # Normalize to standard nested structure
                     normalized_data = normalize_persona_to_nested(persona_data)
-                    persona = Persona(
-                        persona_set_id=persona_set.id,
-                        name=normalized_data.get("name", "Unknown"),
-                        persona_data=normalized_data
-                    )
+                    rows.append({
+                        "persona_set_id": persona_set.id,
+                        "name": normalized_data.get("name", "Unknown"),
+                        **persona_data_columns(normalized_data)
+                    })
                 else:
-                    persona = Persona(
-                        persona_set_id=persona_set.id,
-                        name="Persona",
-                        persona_data={"content": str(persona_data)}
-                    )
-                session.add(persona)
+                    rows.append({
+                        "persona_set_id": persona_set.id,
+                        "name": "Persona",
+                        **persona_data_columns({"content": str(persona_data)})
+                    })
         else:
             # For non-JSON formats, store the formatted content
             # The LLM returns content in the "personas" field as formatted text
@@ -191,22 +531,129 @@ class PersonaService:
                 formatted_content = persona_set_data.get("content", "No personas generated")
             
             # Store as a single persona entry with the formatted content
-            persona = Persona(
-                persona_set_id=persona_set.id,
-                name=f"Persona Set {persona_set.id} - {output_format}",
-                persona_data={
+            rows = [{
+                "persona_set_id": persona_set.id,
+                "name": f"Persona Set {persona_set.id} - {output_format}",
+                **persona_data_columns({
                     "format": output_format,
                     "content": str(formatted_content),
                     "num_personas": num_personas
-                }
+                })
+            }]
+        
+        if not rows:
+            return []
+        result = await session.scalars(insert(Persona).returning(Persona), rows)
+        return list(result.all())
+    
+    @staticmethod
+    async def create_default_persona_set(
+        session: AsyncSession,
+        name: str,
+        description: str,
+        content_hash: str
+    ) -> Optional[PersonaSet]:
+        """
+        Create the (empty) persona set that default personas are loaded into.
+        
+        Inserts with ON CONFLICT DO NOTHING against the unique name of sets
+        loaded from JSON, so a set created concurrently (e.g. by another worker)
+        is never duplicated; returns None in that case.
+        """
+        result = await session.execute(
+            pg_insert(PersonaSet)
+            .values(
+                name=name,
+                description=description,
+                status="generated",
+                generation_cycle=1,
+                content_hash=content_hash
+            )
+            .on_conflict_do_nothing(
+                index_elements=[PersonaSet.name],
+                index_where=PersonaSet.content_hash.isnot(None)
             )
-            session.add(persona)
+            .returning(PersonaSet)
+        )
+        return result.scalar_one_or_none()
+    
+    @staticmethod
+    async def get_default_persona_set(
+        session: AsyncSession,
+        name: str
+    ) -> Optional[PersonaSet]:
+        """Get the persona set loaded from default persona JSON under a name (with its personas)."""
+        result = await session.execute(
+            select(PersonaSet)
+            .where(PersonaSet.name == name, PersonaSet.content_hash.isnot(None))
+            .options(selectinload(PersonaSet.personas))
+        )
+        return result.scalar_one_or_none()
+    
+    @staticmethod
+    async def add_default_personas(
+        session: AsyncSession,
+        persona_set: PersonaSet,
+        personas_data: List[Dict[str, Any]],
+        content_hash: Optional[str] = None
+    ) -> PersonaSet:
+        """
+        Insert personas loaded from a default persona JSON file into a persona set.
+        
+        The personas are inserted with a single bulk INSERT ... RETURNING and
+        attached to the set in memory, so the set can be serialized without
+        being reloaded. content_hash (see default_personas_hash) is recorded on
+        the set for default_set_unchanged.
+        """
+        persona_set.content_hash = content_hash
+        # Conversion and hashing are pure CPU work; keep them off the event loop
+        rows = await asyncio.to_thread(PersonaService._default_persona_rows, persona_set.id, personas_data)
+        result = await session.scalars(insert(Persona).returning(Persona), rows)
+        set_committed_value(persona_set, "personas", list(result.all()))
         
+        # Flush changes to an overwritten set now and fetch the updated_at its
+        # UPDATE set, so it isn't expired (and lazy-loaded) after the commit
         await session.flush()
-        await session.refresh(persona_set)
+        if "updated_at" in inspect(persona_set).expired_attributes:
+            await session.refresh(persona_set, ["updated_at"])
         
         return persona_set
     
+    @staticmethod
+    def _default_persona_rows(persona_set_id: int, personas_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Convert default persona JSON entries to Persona rows for a bulk INSERT."""
+        rows = []
+        for persona_data in personas_data:
+            db_persona_data = convert_persona_to_db_format(persona_data)
+            rows.append({
+                "persona_set_id": persona_set_id,
+                "name": db_persona_data["name"],
+                **persona_data_columns(db_persona_data)
+            })
+        return rows
+    
+    @staticmethod
+    async def default_set_unchanged(
+        session: AsyncSession,
+        persona_set: PersonaSet,
+        content_hash: str,
+        num_personas: int
+    ) -> bool:
+        """
+        Whether a persona set still holds exactly what loading this default persona JSON would write.
+        
+        True when the set was loaded from JSON with the same content hash and
+        still has that many personas, none of which has been modified (expanded,
+        given an image, ...) since, so overwriting it would rewrite identical rows.
+        """
+        if persona_set.content_hash != content_hash:
+            return False
+        total, modified = (await session.execute(
+            select(func.count(), func.count(Persona.updated_at))
+            .where(Persona.persona_set_id == persona_set.id)
+        )).one()
+        return total == num_personas and modified == 0
+    
     @staticmethod
     async def expand_persona(
         session: AsyncSession,
@@ -219,13 +666,178 @@ class PersonaService:
         the persona's characteristics, making it more targeted and efficient.
         """
         result = await session.execute(
-            select(Persona).where(Persona.id == persona_id)
+            _SELECT_PERSONA_BY_ID, {"persona_id": persona_id}
         )
         persona = result.scalar_one_or_none()
         
         if not persona:
             raise ValueError(f"Persona with ID {persona_id} not found")
         
+        await release_connection(session)
+        context_texts = await PersonaService._expansion_context(
+            persona, PersonaService._fallback_context_loader()
+        )
+        expanded_data = await llm_service.expand_persona(
+            persona_basic=persona.persona_data,
+            context_documents=context_texts
+        )
+        merged_data = PersonaService._merge_expansion(persona.persona_data, expanded_data)
+        merged_data["expanded"] = True
+        
+        # Update persona with merged data
+        for key, value in persona_data_columns(merged_data).items():
+            setattr(persona, key, value)
+        
+        # Update persona set status if all personas are expanded
+        if persona.persona_set:
+            PersonaService._mark_set_expanded(persona.persona_set)
+        
+        await session.flush()
+        await session.refresh(persona)
+        
+        return persona
+    
+    @staticmethod
+    async def expand_personas_for_set(
+        session: AsyncSession,
+        persona_set: PersonaSet,
+        max_concurrency: Optional[int] = None
+    ) -> List[Persona]:
+        """
+        Expand the personas of a (loaded) persona set with expand_personas_batch.
+        
+        Personas that are already expanded are returned as they are, without
+        calling the LLM for them again; the error of a failed batch is only
+        raised if none of the personas is expanded.
+        """
+        personas = list(persona_set.personas)
+        to_expand = [persona for persona in personas if not PersonaService._is_expanded(persona)]
+        if to_expand:
+            try:
+                await PersonaService.expand_personas_batch(
+                    session, to_expand, max_concurrency=max_concurrency
+                )
+            except Exception as e:
+                if len(to_expand) == len(personas):
+                    raise
+                logger.warning(f"Expansion failed for the remaining personas of set {persona_set.id}: {e}")
+        else:
+            logger.info(f"All personas of set {persona_set.id} are already expanded")
+        PersonaService._mark_set_expanded(persona_set)
+        await session.flush()
+        return personas
+    
+    @staticmethod
+    async def expand_personas_batch(
+        session: AsyncSession,
+        personas: List[Persona],
+        max_concurrency: Optional[int] = None
+    ) -> List[Persona]:
+        """
+        Expand several personas with one batch of LLM requests.
+        
+        Context is first retrieved for every persona, then all expansion prompts
+        are sent together through llm_service.expand_personas_batch (at most
+        max_concurrency, defaulting to settings.PERSONA_EXPANSION_CONCURRENCY, in
+        flight) and the responses are zipped back onto the personas in one flush.
+        A persona whose expansion fails is returned unexpanded; only if every
+        expansion fails is the first error raised.
+        """
+        if not personas:
+            return []
+        
+        # Don't hold a pooled connection during retrieval and the LLM calls
+        await release_connection(session)
+        load_fallback_context = PersonaService._fallback_context_loader()
+        retrievals = [
+            PersonaService._expansion_context(persona, load_fallback_context) for persona in personas
+        ]
+        contexts = await asyncio.gather(*retrievals, return_exceptions=True)
+        
+        # Only personas whose retrieval succeeded are sent to the LLM
+        batch = [i for i, context in enumerate(contexts) if not isinstance(context, BaseException)]
+        results: List[Any] = list(contexts)
+        expanded = await llm_service.expand_personas_batch(
+            [personas[i].persona_data for i in batch],
+            [contexts[i] for i in batch],
+            max_concurrency=max_concurrency or settings.PERSONA_EXPANSION_CONCURRENCY
+        )
+        for i, expanded_data in zip(batch, expanded):
+            results[i] = expanded_data
+        
+        failures = [
+            (persona, result) for persona, result in zip(personas, results)
+            if isinstance(result, BaseException)
+        ]
+        if len(failures) == len(personas):
+            raise failures[0][1]
+        for persona, error in failures:
+            logger.warning(f"Expansion failed for persona {persona.id}, leaving it unexpanded: {error}")
+        
+        for persona, expanded_data in zip(personas, results):
+            if isinstance(expanded_data, BaseException):
+                continue
+            merged_data = PersonaService._merge_expansion(persona.persona_data, expanded_data)
+            merged_data["expanded"] = True
+            for key, value in persona_data_columns(merged_data).items():
+                setattr(persona, key, value)
+        
+        await session.flush()
+        
+        # Reload server-generated columns (updated_at) for all personas in one query
+        await session.execute(
+            select(Persona)
+            .where(Persona.id.in_([persona.id for persona in personas]))
+            .execution_options(populate_existing=True)
+        )
+        
+        return personas
+    
+    @staticmethod
+    def _fallback_context_loader():
+        """
+        Build a loader for the context used when retrieval finds nothing: the
+        full content of the context documents without chunks (see
+        _unembedded_document_contents).
+        
+        The documents are queried at most once per loader (the lock keeps
+        concurrent expansions from querying them twice), in a short-lived
+        session of their own, so the caller's released session doesn't take
+        a connection again for the LLM calls that follow.
+        """
+        lock = asyncio.Lock()
+        cached: List[List[str]] = []
+        
+        async def load_fallback_context() -> List[str]:
+            async with lock:
+                if not cached:
+                    async with AsyncSessionLocal() as session:
+                        cached.append(await PersonaService._unembedded_document_contents(
+                            session, [Document.document_type == DocumentType.CONTEXT], settings.MAX_CONTEXT_CHARS
+                        ))
+            return cached[0]
+        
+        return load_fallback_context
+    
+    @staticmethod
+    def _is_expanded(persona: Persona) -> bool:
+        """Whether a persona has been expanded (flagged, or detailed by an older expansion)."""
+        return bool(
+            persona.persona_data.get("expanded")
+            or persona.persona_data.get("detailed_description")
+            or persona.persona_data.get("personal_background")
+        )
+    
+    @staticmethod
+    def _mark_set_expanded(persona_set: PersonaSet) -> None:
+        """Update persona set status if all personas are expanded."""
+        all_expanded = all(PersonaService._is_expanded(p) for p in persona_set.personas)
+        if all_expanded:
+            persona_set.status = "expanded"
+    
+    @staticmethod
+    async def _expansion_context(persona: Persona, load_fallback_context) -> List[str]:
+        """Retrieve the context chunks used to expand a persona."""
         # Build a query based on persona characteristics for better retrieval
         persona_name = persona.persona_data.get("name", "")
         persona_occupation = persona.persona_data.get("occupation", "")
@@ -242,28 +854,28 @@ class PersonaService:
         )
         
         # Extract document texts from vector DB results
-        context_texts = []
-        if context_results.get("documents") and len(context_results["documents"]) > 0:
-            for doc_list in context_results["documents"]:
-                context_texts.extend(doc_list)
+        # Order chunks by ID so the same context always yields the same prompt
+        # prefix (and hits the provider's prompt cache)
+        context_texts = [
+            text for _, text, _ in sorted(PersonaService._unique_chunks(context_results), key=lambda chunk: str(chunk[0]))
+        ]
         
-        # Fall back to full documents if no chunks found
+        # Fall back to the context documents that have no chunks (not embedded
+        # yet, or embedding failed); if there are none, expand without context
         if not context_texts:
-            logger.warning("No context chunks found in vector DB, falling back to full documents")
-            context_result = await session.execute(
-                select(Document).where(Document.document_type == DocumentType.CONTEXT)
-            )
-            contexts = list(context_result.scalars().all())
-            context_texts = [context.content for context in contexts]
+            context_texts = await load_fallback_context()
+            if context_texts:
+                logger.warning("No context chunks found in vector DB, falling back to documents without chunks")
+            else:
+                logger.info("No context chunks matched this persona; expanding without context")
         
         logger.info(f"Using {len(context_texts)} context chunks for persona expansion")
         
-        # Expand persona using LLM with retrieved chunks
-        expanded_data = await llm_service.expand_persona(
-            persona_basic=persona.persona_data,
-            context_documents=context_texts
-        )
-        
+        return context_texts
+    
+    @staticmethod
+    def _merge_expansion(original_data: Dict[str, Any], expanded_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Strictly merge an LLM expansion into the original persona_data."""
         # Demographic fields that must NEVER be changed (flat structure)
         DEMOGRAPHIC_FIELDS = {
             'name', 'age', 'gender', 'nationality', 'education_level', 'income_bracket',
@@ -282,7 +894,7 @@ class PersonaService:
         }
         
         # Normalize both original and expanded to nested structure first
-        original_normalized = normalize_persona_to_nested(persona.persona_data)
+        original_normalized = normalize_persona_to_nested(original_data)
         expanded_normalized = normalize_persona_to_nested(expanded_data)
         
         # Strict merge: Only keep fields that exist in the original, remove any new fields
@@ -355,8 +967,8 @@ class PersonaService:
         # Final validation: Ensure structure matches original
         # If original had flat structure, ensure merged doesn't have nested demographics
         original_has_flat_demographics = all(
-            key in persona.persona_data for key in ['age', 'gender', 'occupation']
-        ) and 'demographics' not in persona.persona_data
+            key in original_data for key in ['age', 'gender', 'occupation']
+        ) and 'demographics' not in original_data
         
         if original_has_flat_demographics and 'demographics' in merged_data:
             logger.warning("Expansion tried to add nested 'demographics' but original has flat structure. Removing nested structure.")
@@ -367,23 +979,7 @@ class PersonaService:
                 # But don't add them back - keep original flat structure
                 logger.info("Removed nested demographics structure to preserve original flat structure")
         
-        # Update persona with merged data
-        persona.persona_data = merged_data
-        
-        # Update persona set status if all personas are expanded
-        persona_set = persona.persona_set
-        if persona_set:
-            all_expanded = all(
-                p.persona_data.get("detailed_description") or p.persona_data.get("personal_background")
-                for p in persona_set.personas
-            )
-            if all_expanded:
-                persona_set.status = "expanded"
-        
-        await session.flush()
-        await session.refresh(persona)
-        
-        return persona
+        return merged_data
     
     @staticmethod
     async def generate_persona_image(
@@ -391,21 +987,27 @@ class PersonaService:
         persona_id: int
     ) -> Persona:
         """Generate an image for a persona."""
-        from app.utils.image_utils import download_and_save_image
-        
         result = await session.execute(
-            select(Persona).where(Persona.id == persona_id)
+            _SELECT_PERSONA_BY_ID, {"persona_id": persona_id}
         )
         persona = result.scalar_one_or_none()
         
         if not persona:
             raise ValueError(f"Persona with ID {persona_id} not found")
         
-        # Generate image prompt
-        image_prompt = await llm_service.generate_persona_image_prompt(persona.persona_data)
+        # Reuse the stored image prompt if the persona hasn't changed since it was generated
+        prompt_hash = persona.content_hash or persona_data_hash(persona.persona_data)
+        if persona.image_prompt and persona.image_prompt_hash == prompt_hash:
+            image_prompt = persona.image_prompt
+        else:
+            image_prompt = await llm_service.generate_persona_image_prompt(persona.persona_data)
         
-        # Generate image (returns temporary DALL-E URL)
-        dall_e_url = await llm_service.generate_image(image_prompt)
+        # Generate image (returns temporary DALL-E URL) while making sure the
+        # images directory exists, so the download can start right away
+        dall_e_url, _ = await asyncio.gather(
+            llm_service.generate_image(image_prompt),
+            ensure_images_dir()
+        )
         
         # Download and save the image locally
         local_image_path = await download_and_save_image(dall_e_url, persona_id)
@@ -414,14 +1016,163 @@ class PersonaService:
             logger.warning(f"Failed to download image for persona {persona_id}, using DALL-E URL")
             local_image_path = dall_e_url
         
-        # Update persona with local image path
+        # Update persona with local image path (committed at the request boundary)
         persona.image_url = local_image_path
         persona.image_prompt = image_prompt
-        await session.commit()
+        persona.image_prompt_hash = prompt_hash
+        await session.flush()
         await session.refresh(persona)
         
         return persona
     
+    @staticmethod
+    async def generate_persona_images_for_set(
+        session: AsyncSession,
+        persona_set_id: int,
+        max_concurrency: Optional[int] = None
+    ) -> List[Persona]:
+        """
+        Generate images for all personas in a set.
+        
+        Image prompts are generated with a single LLM request for the personas
+        whose data changed since their stored prompt was generated, DALL-E generations and downloads run concurrently (bounded by
+        max_concurrency, defaulting to settings.IMAGE_GENERATION_CONCURRENCY) and
+        the results are written back in one bulk UPDATE.
+        
+        Returns the personas whose image was generated. A persona whose
+        generation fails keeps its current image; only if every generation
+        fails is the first error raised.
+        """
+        persona_set = await session.get(PersonaSet, persona_set_id)
+        if not persona_set:
+            raise ValueError(f"Persona set with ID {persona_set_id} not found")
+        
+        result = await session.execute(
+            select(Persona)
+            .where(Persona.persona_set_id == persona_set_id)
+            .order_by(Persona.id)
+        )
+        personas = list(result.scalars().all())
+        if not personas:
+            return []
+        
+        # Don't hold a pooled connection during the LLM and DALL-E calls
+        await release_connection(session)
+        
+        # Reuse stored image prompts of unchanged personas; generate the rest in one batch
+        prompt_hashes = [
+            persona.content_hash or persona_data_hash(persona.persona_data)
+            for persona in personas
+        ]
+        stale_personas = [
+            persona for persona, prompt_hash in zip(personas, prompt_hashes)
+            if not (persona.image_prompt and persona.image_prompt_hash == prompt_hash)
+        ]
+        new_prompts, _ = await asyncio.gather(
+            llm_service.generate_persona_image_prompts_batch(
+                [persona.persona_data for persona in stale_personas]
+            ),
+            ensure_images_dir()
+        )
+        new_prompts_by_id = {persona.id: prompt for persona, prompt in zip(stale_personas, new_prompts)}
+        image_prompts = [new_prompts_by_id.get(persona.id, persona.image_prompt) for persona in personas]
+        
+        semaphore = asyncio.Semaphore(max_concurrency or settings.IMAGE_GENERATION_CONCURRENCY)
+        
+        async def generate_and_download(persona: Persona, image_prompt: str) -> str:
+            async with semaphore:
+                dall_e_url = await llm_service.generate_image(image_prompt)
+                local_image_path = await download_and_save_image(dall_e_url, persona.id)
+            if not local_image_path:
+                logger.warning(f"Failed to download image for persona {persona.id}, using DALL-E URL")
+                return dall_e_url
+            return local_image_path
+        
+        image_urls = await asyncio.gather(*[
+            generate_and_download(persona, image_prompt)
+            for persona, image_prompt in zip(personas, image_prompts)
+        ], return_exceptions=True)
+        
+        generated = []
+        for persona, image_url, image_prompt, prompt_hash in zip(personas, image_urls, image_prompts, prompt_hashes):
+            if isinstance(image_url, BaseException):
+                logger.warning(f"Image generation failed for persona {persona.id}, keeping its current image: {image_url}")
+                continue
+            generated.append((persona, image_url, image_prompt, prompt_hash))
+        if not generated:
+            raise next(url for url in image_urls if isinstance(url, BaseException))
+        
+        # Persist all image paths in a single bulk UPDATE (committed at the request boundary)
+        await session.execute(
+            update(Persona),
+            [
+                {
+                    "id": persona.id,
+                    "image_url": image_url,
+                    "image_prompt": image_prompt,
+                    "image_prompt_hash": prompt_hash
+                }
+                for persona, image_url, image_prompt, prompt_hash in generated
+            ]
+        )
+        for persona, image_url, image_prompt, prompt_hash in generated:
+            set_committed_value(persona, "image_url", image_url)
+            set_committed_value(persona, "image_prompt", image_prompt)
+            set_committed_value(persona, "image_prompt_hash", prompt_hash)
+        
+        return [persona for persona, _, _, _ in generated]
+    
+    @staticmethod
+    async def create_image_job(session: AsyncSession, persona_set_id: int) -> ImageJob:
+        """Queue an image generation job for a persona set (run it with generate_all_images)."""
+        persona_set = await session.get(PersonaSet, persona_set_id)
+        if not persona_set:
+            raise ValueError(f"Persona set with ID {persona_set_id} not found")
+        
+        job = ImageJob(persona_set_id=persona_set_id, status="queued")
+        session.add(job)
+        await session.flush()
+        await session.refresh(job)
+        return job
+    
+    @staticmethod
+    async def get_latest_image_job(session: AsyncSession, persona_set_id: int) -> Optional[ImageJob]:
+        """Get the most recently queued image job of a persona set."""
+        result = await session.execute(
+            select(ImageJob)
+            .where(ImageJob.persona_set_id == persona_set_id)
+            .order_by(ImageJob.id.desc())
+            .limit(1)
+        )
+        return result.scalar_one_or_none()
+    
+    @staticmethod
+    async def generate_all_images(persona_set_id: int, job_id: int) -> None:
+        """Run a queued image job in its own session, recording the outcome on the job row."""
+        try:
+            async with AsyncSessionLocal() as session:
+                job = await session.get(ImageJob, job_id)
+                if job is None:
+                    logger.warning(f"Image job {job_id} no longer exists, skipping")
+                    return
+                
+                job.status = "running"
+                await session.commit()
+                
+                try:
+                    personas = await PersonaService.generate_persona_images_for_set(session, persona_set_id)
+                except Exception as e:
+                    logger.error(f"Image job {job_id} for persona set {persona_set_id} failed: {e}")
+                    await session.rollback()
+                    job.status = "failed"
+                    job.error = str(e)
+                else:
+                    job.status = "completed"
+                    job.generated_count = len(personas)
+                await session.commit()
+        except Exception as e:
+            logger.error(f"Error running image job {job_id}: {e}")
+    
     @staticmethod
     async def save_persona_set(
         session: AsyncSession,
@@ -431,7 +1182,7 @@ class PersonaService:
     ) -> PersonaSet:
         """Save/update a persona set."""
         result = await session.execute(
-            select(PersonaSet).where(PersonaSet.id == persona_set_id)
+            _SELECT_PERSONA_SET_BY_ID, {"persona_set_id": persona_set_id}
         )
         persona_set = result.scalar_one_or_none()
         
@@ -454,30 +1205,155 @@ class PersonaService:
         persona_set_id: int
     ) -> Optional[PersonaSet]:
         """Get a persona set by ID."""
-        from sqlalchemy.orm import selectinload
         result = await session.execute(
-            select(PersonaSet)
-            .where(PersonaSet.id == persona_set_id)
-            .options(selectinload(PersonaSet.personas))
+            _SELECT_PERSONA_SET_WITH_PERSONAS_BY_ID, {"persona_set_id": persona_set_id}
         )
         return result.scalar_one_or_none()
     
     @staticmethod
-    async def get_all_persona_sets(
-        session: AsyncSession
-    ) -> List[PersonaSet]:
-        """Get all persona sets."""
-        from sqlalchemy.orm import selectinload
+    async def get_persona_set_response(
+        session: AsyncSession,
+        persona_set_id: int,
+        version: Optional[Tuple[Optional[datetime], int]] = None
+    ) -> Optional[Tuple[PersonaSetResponse, Tuple[Optional[datetime], int]]]:
+        """
+        Get a persona set by ID as a (cached) read-only response, with its version.
+        
+        A cached response is only used if it was loaded at the given version
+        (see get_persona_set_version), or if no version is given; otherwise the
+        set is reloaded and the cache entry replaced. Returns None if the set
+        doesn't exist.
+        """
+        entry = _persona_set_response_cache.get(persona_set_id)
+        if entry is None or (version is not None and entry[0] != version):
+            persona_set = await PersonaService.get_persona_set(session, persona_set_id)
+            if not persona_set:
+                return None
+            entry = (
+                PersonaService._loaded_persona_set_version(persona_set),
+                PersonaSetResponse.model_validate(persona_set)
+            )
+            _persona_set_response_cache.set(persona_set_id, entry)
+        return entry[1], entry[0]
+    
+    @staticmethod
+    async def get_persona_set_version(
+        session: AsyncSession,
+        persona_set_id: int
+    ) -> Optional[Tuple[Optional[datetime], int]]:
+        """
+        Get the version of a persona set without loading it.
+        
+        Returns the latest modification time of the set or any of its
+        personas, and its persona count (to catch deletions), or None if the
+        set doesn't exist.
+        """
+        persona_modified_at = func.max(func.coalesce(Persona.updated_at, Persona.created_at))
         result = await session.execute(
-            select(PersonaSet).options(selectinload(PersonaSet.personas))
+            select(
+                func.coalesce(PersonaSet.updated_at, PersonaSet.created_at),
+                persona_modified_at,
+                func.count(Persona.id)
+            )
+            .outerjoin(Persona, Persona.persona_set_id == PersonaSet.id)
+            .where(PersonaSet.id == persona_set_id)
+            .group_by(PersonaSet.id)
         )
-        return list(result.scalars().all())
+        row = result.one_or_none()
+        if row is None:
+            return None
+        
+        set_modified_at, persona_modified_at, persona_count = row
+        modified_at = max(
+            (t for t in (set_modified_at, persona_modified_at) if t is not None),
+            default=None
+        )
+        return modified_at, persona_count
+    
+    @staticmethod
+    def _loaded_persona_set_version(persona_set: PersonaSet) -> Tuple[Optional[datetime], int]:
+        """Version of a persona set loaded with its personas (as in get_persona_set_version)."""
+        modified_at = max(
+            (
+                t for t in chain(
+                    [persona_set.updated_at or persona_set.created_at],
+                    (persona.updated_at or persona.created_at for persona in persona_set.personas)
+                )
+                if t is not None
+            ),
+            default=None
+        )
+        return modified_at, len(persona_set.personas)
     
     @staticmethod
-    async def _get_all_persona_sets(
-        session: AsyncSession
+    async def get_all_persona_set_responses(
+        session: AsyncSession,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> List[PersonaSetResponse]:
+        """
+        Get a page of persona sets as (cached) read-only responses.
+        
+        Sets are ordered newest first. Caches the set ids of each page
+        separately from the sets themselves, so only the sets missing from the
+        cache are loaded (with a single query).
+        """
+        page_key = (limit, offset)
+        persona_set_ids = _persona_set_ids_cache.get(page_key)
+        if persona_set_ids is None:
+            query = select(PersonaSet.id).order_by(*_PERSONA_SETS_NEWEST_FIRST).offset(offset)
+            if limit is not None:
+                query = query.limit(limit)
+            result = await session.execute(query)
+            persona_set_ids = tuple(result.scalars().all())
+            _persona_set_ids_cache.set(page_key, persona_set_ids)
+        
+        responses = {}
+        missing_ids = []
+        for persona_set_id in persona_set_ids:
+            entry = _persona_set_response_cache.get(persona_set_id)
+            if entry is None:
+                missing_ids.append(persona_set_id)
+            else:
+                responses[persona_set_id] = entry[1]
+        
+        if missing_ids:
+            result = await session.execute(
+                select(PersonaSet)
+                .where(PersonaSet.id.in_(missing_ids))
+                .options(selectinload(PersonaSet.personas))
+            )
+            persona_sets = result.scalars().all()
+            validated = _PERSONA_SET_LIST_ADAPTER.validate_python(persona_sets, from_attributes=True)
+            for persona_set, response in zip(persona_sets, validated):
+                _persona_set_response_cache.set(
+                    response.id, (PersonaService._loaded_persona_set_version(persona_set), response)
+                )
+                responses[response.id] = response
+        
+        return [responses[i] for i in persona_set_ids if i in responses]
+    
+    @staticmethod
+    async def get_all_persona_sets(
+        session: AsyncSession,
+        limit: Optional[int] = None,
+        offset: int = 0
     ) -> List[PersonaSet]:
-        """Internal method to get all persona sets."""
-        result = await session.execute(select(PersonaSet))
+        """Get all persona sets, or a page of them (newest first)."""
+        query = (
+            select(PersonaSet)
+            .order_by(*_PERSONA_SETS_NEWEST_FIRST)
+            .offset(offset)
+            .options(selectinload(PersonaSet.personas))
+        )
+        if limit is not None:
+            query = query.limit(limit)
+        result = await session.execute(query)
         return list(result.scalars().all())
+    
+    @staticmethod
+    async def _next_persona_set_name(session: AsyncSession) -> str:
+        """Default name for a newly generated persona set ("Persona Set <count + 1>")."""
+        count = await session.scalar(select(func.count()).select_from(PersonaSet))
+        return f"Persona Set {count + 1}"
 
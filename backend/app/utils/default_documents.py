@@ -3,8 +3,10 @@ Utility to create default documents on startup.
 """
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from app.core.database import AsyncSessionLocal
 from app.models.document import Document, DocumentType
 from app.services.document_service import DocumentService
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
@@ -100,74 +102,60 @@ User: "Efficiency is my primary metric for success. I have a low tolerance for s
 """
 
 
-async def create_default_documents(session: AsyncSession) -> None:
-    """Create default documents if they don't exist."""
-    try:
-        # Check if default context document exists
-        context_result = await session.execute(
-            select(Document).where(
-                Document.filename == "default_context.md",
-                Document.document_type == DocumentType.CONTEXT
-            )
-        )
-        existing_context = context_result.scalar_one_or_none()
-        
-        if not existing_context:
-            logger.info("Creating default context document")
-            # Create default context document
-            document = await DocumentService.process_document(
-                session=session,
-                file_path="",  # No file, using text content
-                filename="default_context.md",
-                document_type=DocumentType.CONTEXT,
-                content=DEFAULT_CONTEXT_DOCUMENT
-            )
-            logger.info(f"Created default context document with ID: {document.id}")
-        
-        # Check if default interview document exists
-        interview_result = await session.execute(
-            select(Document).where(
-                Document.filename == "default_interview.md",
-                Document.document_type == DocumentType.INTERVIEW
-            )
-        )
-        existing_interview = interview_result.scalar_one_or_none()
-        
-        if not existing_interview:
-            logger.info("Creating default interview document")
-            # Create default interview document
+# (filename, document_type, content, label) for each default document
+DEFAULT_DOCUMENTS = (
+    ("default_context.md", DocumentType.CONTEXT, DEFAULT_CONTEXT_DOCUMENT, "default context document"),
+    ("default_interview.md", DocumentType.INTERVIEW, DEFAULT_INTERVIEW_DOCUMENT, "default interview document"),
+    ("transcripts-cipherbot.md", DocumentType.INTERVIEW, DEFAULT_TRANSCRIPT_DOCUMENT, "default CipherBot transcript document"),
+)
+_DEFAULT_DOCUMENT_FILENAMES = tuple(filename for filename, _, _, _ in DEFAULT_DOCUMENTS)
+
+
+async def _create_default_document(
+    filename: str,
+    document_type: DocumentType,
+    content: str,
+    label: str
+) -> None:
+    """Process and commit one default document in its own session."""
+    async with AsyncSessionLocal() as session:
+        try:
+            logger.info(f"Creating {label}")
             document = await DocumentService.process_document(
                 session=session,
                 file_path="",  # No file, using text content
-                filename="default_interview.md",
-                document_type=DocumentType.INTERVIEW,
-                content=DEFAULT_INTERVIEW_DOCUMENT
+                filename=filename,
+                document_type=document_type,
+                content=content
             )
-            logger.info(f"Created default interview document with ID: {document.id}")
-        
-        # Check if default transcript document exists
-        transcript_result = await session.execute(
-            select(Document).where(
-                Document.filename == "transcripts-cipherbot.md",
-                Document.document_type == DocumentType.INTERVIEW
+            await session.commit()
+            logger.info(f"Created {label} with ID: {document.id}")
+        except Exception as e:
+            logger.error(f"Error creating {label}: {e}")
+            await session.rollback()
+
+
+async def create_default_documents(session: AsyncSession) -> None:
+    """Create default documents if they don't exist."""
+    try:
+        # Check which default documents already exist with a single query
+        existing_result = await session.execute(
+            select(Document.filename, Document.document_type).where(
+                Document.filename.in_(_DEFAULT_DOCUMENT_FILENAMES)
             )
         )
-        existing_transcript = transcript_result.scalar_one_or_none()
-        
-        if not existing_transcript:
-            logger.info("Creating default CipherBot transcript document")
-            # Create default transcript document
-            document = await DocumentService.process_document(
-                session=session,
-                file_path="",  # No file, using text content
-                filename="transcripts-cipherbot.md",
-                document_type=DocumentType.INTERVIEW,
-                content=DEFAULT_TRANSCRIPT_DOCUMENT
-            )
-            logger.info(f"Created default CipherBot transcript document with ID: {document.id}")
-        
-        await session.commit()
+        existing = {(row.filename, row.document_type) for row in existing_result}
     except Exception as e:
         logger.error(f"Error creating default documents: {e}")
         await session.rollback()
-
+        return
+    
+    pending = [
+        (filename, document_type, content, label)
+        for filename, document_type, content, label in DEFAULT_DOCUMENTS
+        if (filename, document_type) not in existing
+    ]
+    
+    # Embedding calls dominate; process missing documents concurrently.
+    # process_document flushes on its session, so each task gets its own.
+    await asyncio.gather(*(_create_default_document(*doc) for doc in pending))
@@ -0,0 +1,28 @@
+"""
+ETag helpers for conditional GET requests.
+"""
+from datetime import datetime
+from typing import Optional, Union
+
+
+def make_etag(*parts: Union[int, str, Optional[datetime]]) -> str:
+    """
+    Build an ETag from a resource's ID and version parts.
+    
+    Datetimes are rendered as microsecond timestamps (0 if missing).
+    """
+    rendered = []
+    for part in parts:
+        if isinstance(part, datetime) or part is None:
+            part = int(part.timestamp() * 1_000_000) if part else 0
+        rendered.append(str(part))
+    return f'"{"-".join(rendered)}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Check an If-None-Match header (which may list several tags) against an ETag."""
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
@@ -1,16 +1,73 @@
 """
 Utility functions for processing different file types.
 """
+from concurrent.futures import ProcessPoolExecutor
 import aiofiles
-import io
+import asyncio
+import multiprocessing
+import os
 from pathlib import Path
 from typing import Optional
 
+from app.core.config import settings
+
+# Extensions that are read as UTF-8 text without a parser
+TEXT_EXTENSIONS = frozenset({'.txt', '.md'})
+
+# Worker processes for CPU-bound PDF/DOCX parsing, created on first use
+_extraction_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_extraction_pool() -> ProcessPoolExecutor:
+    """Get (or lazily create) the shared text extraction process pool."""
+    global _extraction_pool
+    if _extraction_pool is None:
+        workers = settings.EXTRACTION_WORKERS or os.cpu_count() or 1
+        # spawn: forked children would inherit the parent's event loop and DB connections
+        _extraction_pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _extraction_pool
+
+
+def shutdown_extraction_pool() -> None:
+    """Shut down the text extraction process pool if it was started."""
+    global _extraction_pool
+    if _extraction_pool is not None:
+        _extraction_pool.shutdown(cancel_futures=True)
+        _extraction_pool = None
+
+
+def decode_text(data: bytes) -> str:
+    """Decode UTF-8 text bytes with the same newline handling as a text-mode read."""
+    return data.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
+
 
 async def extract_text_from_file(file_path: str, file_extension: str) -> str:
     """
     Extract text content from various file types.
     
+    Plain text is read on the event loop; PDF and DOCX parsing is CPU-bound
+    and runs in the extraction process pool so concurrent uploads don't
+    serialize on the GIL.
+    """
+    file_ext = file_extension.lower()
+    
+    if file_ext in TEXT_EXTENSIONS:
+        async with aiofiles.open(file_path, 'r', encoding='utf-8') as f:
+            return await f.read()
+    
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_extraction_pool(), extract_text_from_file_sync, file_path, file_ext
+    )
+
+
+def extract_text_from_file_sync(file_path: str, file_extension: str) -> str:
+    """
+    Extract text content from various file types.
+    
     Currently supports:
     - .txt, .md: Direct text reading
     - .pdf: Requires pypdf (add to requirements if needed)
@@ -18,20 +75,18 @@ async def extract_text_from_file(file_path: str, file_extension: str) -> str:
     """
     file_ext = file_extension.lower()
     
-    if file_ext in ['.txt', '.md']:
-        async with aiofiles.open(file_path, 'r', encoding='utf-8') as f:
-            return await f.read()
+    if file_ext in TEXT_EXTENSIONS:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return f.read()
     
     elif file_ext == '.pdf':
         # For PDF support, you would need: pip install pypdf
         try:
             import pypdf
             text = ""
-            async with aiofiles.open(file_path, 'rb') as f:
-                content = await f.read()
-                pdf_reader = pypdf.PdfReader(io.BytesIO(content))
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
+            pdf_reader = pypdf.PdfReader(file_path)
+            for page in pdf_reader.pages:
+                text += page.extract_text() + "\n"
             return text
         except ImportError:
             raise ValueError("PDF support requires 'pypdf' package. Install with: pip install pypdf")
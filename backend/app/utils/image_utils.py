@@ -1,11 +1,13 @@
 """
 Utility functions for downloading and storing persona images.
 """
-import aiohttp
 import aiofiles
+import asyncio
 import os
+import time
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Set
+import httpx
 import logging
 
 logger = logging.getLogger(__name__)
@@ -14,11 +16,59 @@ logger = logging.getLogger(__name__)
 IMAGES_DIR = Path("/app/static/images/personas")
 IMAGES_DIR.mkdir(parents=True, exist_ok=True)
 
+# Images up to this size are downloaded in one read and written with a single
+# write; larger or unknown-size responses are streamed in DOWNLOAD_CHUNK_SIZE chunks
+MAX_IN_MEMORY_IMAGE_BYTES = 16 * 1024 * 1024
+DOWNLOAD_CHUNK_SIZE = 256 * 1024
+
+# Cached listing of IMAGES_DIR used by image_exists; downloads add to it and it
+# is re-read periodically to pick up changes made by other processes
+IMAGE_LISTING_TTL_SECONDS = 30
+_image_filenames: Optional[Set[str]] = None
+_image_filenames_loaded_at = 0.0
+
+# Shared HTTP/2 client so the image downloads of a persona set are multiplexed
+# over one keep-alive connection per host instead of a TCP/TLS handshake each
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the shared httpx client used for image downloads (created lazily)."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=32,  # Connection pool size
+                max_keepalive_connections=32,
+                keepalive_expiry=60  # Keep idle connections open for reuse
+            ),
+            timeout=30,
+            follow_redirects=True
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the shared httpx client (called on application shutdown)."""
+    global _http_client
+    if _http_client is not None and not _http_client.is_closed:
+        await _http_client.aclose()
+    _http_client = None
+
+
+async def ensure_images_dir() -> Path:
+    """Create the images directory off the event loop if it doesn't exist."""
+    await asyncio.to_thread(IMAGES_DIR.mkdir, parents=True, exist_ok=True)
+    return IMAGES_DIR
+
 
 async def download_and_save_image(image_url: str, persona_id: int) -> Optional[str]:
     """
     Download an image from a URL and save it locally.
     
+    The images directory is expected to exist (see ensure_images_dir).
+    
     Args:
         image_url: URL of the image to download
         persona_id: ID of the persona (used for filename)
@@ -27,26 +77,31 @@ async def download_and_save_image(image_url: str, persona_id: int) -> Optional[s
         Relative path to the saved image, or None if download failed
     """
     try:
-        # Create images directory if it doesn't exist
-        IMAGES_DIR.mkdir(parents=True, exist_ok=True)
-        
         # Generate filename
         filename = f"persona_{persona_id}.png"
         filepath = IMAGES_DIR / filename
         
         # Download image
-        async with aiohttp.ClientSession() as session:
-            async with session.get(image_url) as response:
-                if response.status == 200:
+        async with get_http_client().stream("GET", image_url) as response:
+            if response.status_code == 200:
+                content_length = response.headers.get("content-length")
+                if content_length is not None and int(content_length) <= MAX_IN_MEMORY_IMAGE_BYTES:
+                    # Typical generated images fit in memory: one read, one write
+                    body = await response.aread()
+                    await asyncio.to_thread(filepath.write_bytes, body)
+                else:
                     async with aiofiles.open(filepath, 'wb') as f:
-                        async for chunk in response.content.iter_chunked(8192):
+                        async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
                             await f.write(chunk)
-                    
-                    # Return relative path for serving
-                    return f"/static/images/personas/{filename}"
-                else:
-                    logger.error(f"Failed to download image from {image_url}: HTTP {response.status}")
-                    return None
+                
+                if _image_filenames is not None:
+                    _image_filenames.add(filename)
+                
+                # Return relative path for serving
+                return f"/static/images/personas/{filename}"
+            else:
+                logger.error(f"Failed to download image from {image_url}: HTTP {response.status_code}")
+                return None
     except Exception as e:
         logger.error(f"Error downloading image from {image_url}: {e}", exc_info=True)
         return None
@@ -58,7 +113,25 @@ def get_image_path(persona_id: int) -> Path:
     return IMAGES_DIR / filename
 
 
+def _refresh_image_filenames() -> None:
+    """Re-read the images directory listing with a single scandir."""
+    global _image_filenames, _image_filenames_loaded_at
+    try:
+        with os.scandir(IMAGES_DIR) as entries:
+            _image_filenames = {entry.name for entry in entries}
+    except FileNotFoundError:
+        _image_filenames = set()
+    _image_filenames_loaded_at = time.monotonic()
+
+
 def image_exists(persona_id: int) -> bool:
-    """Check if an image exists for a persona."""
-    return get_image_path(persona_id).exists()
+    """
+    Check if an image exists for a persona.
+    
+    Uses a cached listing of the images directory (refreshed every
+    IMAGE_LISTING_TTL_SECONDS) instead of a stat call per persona.
+    """
+    if _image_filenames is None or time.monotonic() - _image_filenames_loaded_at > IMAGE_LISTING_TTL_SECONDS:
+        _refresh_image_filenames()
+    return f"persona_{persona_id}.png" in _image_filenames
 
@@ -2,19 +2,38 @@
 Utility to load default personas from JSON file(s).
 Supports multiple persona sets from different files.
 """
-import json
+import orjson
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import logging
 import glob
 
+from app.core.config import settings
+from app.utils.persona_normalizer import normalize_persona_to_nested, NORMALIZER_VERSION
+from app.utils.persona_data import persona_data_hash
+from app.utils.ttl_cache import TTLCache
+
 logger = logging.getLogger(__name__)
 
 
+# Loaded persona files keyed by (file_path, set_name). Only successful loads are
+# cached, so files added later are still picked up on the next call.
+_loaded_personas_cache: Dict[Tuple[Optional[str], Optional[str]], Dict[str, Any]] = {}
+
+# Available persona set files. Listing them globs and stats several search
+# directories, and the files only change with a deployment, so the scan is
+# reused for a short while.
+_available_sets_cache = TTLCache(maxsize=1, ttl_seconds=settings.AVAILABLE_PERSONA_SETS_CACHE_TTL_SECONDS)
+
+
 def load_default_personas(file_path: Optional[str] = None, set_name: Optional[str] = None) -> Dict[str, Any]:
     """
     Load default personas from JSON file.
     
+    Results are memoized per (file_path, set_name) so repeated calls skip the
+    path probing and JSON parsing; the returned dictionary is shared between
+    callers and must be treated as read-only.
+    
     Args:
         file_path: Optional specific file path to load. If None, tries default locations.
         set_name: Optional set name to look for (e.g., "set1", "set2"). 
@@ -23,13 +42,32 @@ def load_default_personas(file_path: Optional[str] = None, set_name: Optional[st
     Returns:
         Dictionary with personas and metadata
     """
+    cache_key = (file_path, set_name)
+    data = _loaded_personas_cache.get(cache_key)
+    if data is None:
+        data = _load_default_personas(file_path, set_name)
+        if data.get("personas"):
+            _loaded_personas_cache[cache_key] = data
+    return data
+
+
+def default_personas_hash(default_data: Dict[str, Any]) -> str:
+    """
+    Content hash of loaded default persona data, stored on the persona sets loaded from it.
+    
+    Includes NORMALIZER_VERSION, since the stored personas are the normalized form.
+    """
+    return persona_data_hash([NORMALIZER_VERSION, default_data])
+
+
+def _load_default_personas(file_path: Optional[str] = None, set_name: Optional[str] = None) -> Dict[str, Any]:
+    """Load default personas from JSON file without caching (see load_default_personas)."""
     # If specific file path provided, use it
     if file_path:
         json_path = Path(file_path)
         if json_path.exists():
             try:
-                with open(json_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+                data = orjson.loads(json_path.read_bytes())
                 
                 # Handle different JSON structures
                 if isinstance(data, list):
@@ -52,7 +90,7 @@ def load_default_personas(file_path: Optional[str] = None, set_name: Optional[st
                 
                 logger.info(f"Loaded {len(data.get('personas', []))} personas from {json_path}")
                 return data
-            except (FileNotFoundError, json.JSONDecodeError) as e:
+            except (FileNotFoundError, orjson.JSONDecodeError) as e:
                 logger.error(f"Error loading personas from {json_path}: {e}")
                 return {"personas": [], "metadata": {}}
         else:
@@ -81,8 +119,7 @@ def load_default_personas(file_path: Optional[str] = None, set_name: Optional[st
             try:
                 if json_path.exists():
                     logger.info(f"Attempting to load persona set from: {json_path}")
-                    with open(json_path, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
+                    data = orjson.loads(json_path.read_bytes())
                     
                     logger.debug(f"Raw data type: {type(data)}, keys: {data.keys() if isinstance(data, dict) else 'N/A'}")
                     
@@ -113,7 +150,7 @@ def load_default_personas(file_path: Optional[str] = None, set_name: Optional[st
                         continue
                     
                     return data
-            except (FileNotFoundError, json.JSONDecodeError) as e:
+            except (FileNotFoundError, orjson.JSONDecodeError) as e:
                 logger.warning(f"Error loading {json_path}: {e}", exc_info=True)
                 continue
         
@@ -130,8 +167,7 @@ def load_default_personas(file_path: Optional[str] = None, set_name: Optional[st
     for json_path in possible_paths:
         try:
             if json_path.exists():
-                with open(json_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+                data = orjson.loads(json_path.read_bytes())
                 
                 # Handle different JSON structures
                 if isinstance(data, list):
@@ -160,7 +196,7 @@ def load_default_personas(file_path: Optional[str] = None, set_name: Optional[st
                     continue
                 
                 return data
-        except (FileNotFoundError, json.JSONDecodeError) as e:
+        except (FileNotFoundError, orjson.JSONDecodeError) as e:
             logger.warning(f"Error loading {json_path}: {e}")
             continue
     
@@ -173,9 +209,22 @@ def list_available_persona_sets() -> List[Dict[str, str]]:
     """
     List all available persona set files.
     
+    The scan is cached for AVAILABLE_PERSONA_SETS_CACHE_TTL_SECONDS; the
+    returned dictionaries are shared between callers and must be treated as
+    read-only.
+    
     Returns:
         List of dictionaries with 'name' and 'path' for each available set
     """
+    sets = _available_sets_cache.get("all")
+    if sets is None:
+        sets = _list_available_persona_sets()
+        _available_sets_cache.set("all", sets)
+    return list(sets)
+
+
+def _list_available_persona_sets() -> List[Dict[str, str]]:
+    """List all available persona set files without caching (see list_available_persona_sets)."""
     sets = []
     
     # Check root directory
@@ -243,7 +292,6 @@ def convert_persona_to_db_format(persona_data: Dict[str, Any]) -> Dict[str, Any]
     This function normalizes all personas to the standard nested structure
     for consistency across all persona sets.
     """
-    from app.utils.persona_normalizer import normalize_persona_to_nested
     # Normalize to standard nested structure
     return normalize_persona_to_nested(persona_data)
 
@@ -4,60 +4,157 @@ Migration script to convert all existing personas to the standard nested structu
 Run this script to normalize all personas in the database to the nested format.
 """
 import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
 from app.core.database import AsyncSessionLocal
 from app.models.persona import Persona
-from app.utils.persona_normalizer import normalize_persona_to_nested
-from sqlalchemy import select
+from app.utils.persona_data import persona_data_columns
+from app.utils.persona_normalizer import (
+    normalize_persona_to_nested, is_normalized, NORMALIZER_VERSION, NORMALIZER_VERSION_KEY
+)
+from sqlalchemy import select, update, or_, cast
+from sqlalchemy.dialects.postgresql import JSONB, array
+from typing import List, Dict, Any, Tuple, Optional
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-async def migrate_all_personas_to_nested():
+def _collect_updates(rows: List[Tuple[int, str, Any]]) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Normalize a batch of (id, name, persona_data) rows.
+    
+    Every row gets an update so its norm_version column records that the current
+    normalizer has seen it; persona_data itself is only rewritten if it changed.
+    
+    Returns:
+        Update parameters ({"id", "persona_data", "norm_version", "content_hash"})
+        for every row, and the number of personas whose data changed
+    """
+    updates = []
+    changed_count = 0
+    for persona_id, persona_name, persona_data in rows:
+        new_data = persona_data
+        try:
+            # Check if already in nested format (has demographics object)
+            if isinstance(persona_data, dict):
+                has_demographics = "demographics" in persona_data
+                has_flat_demographics = any(key in persona_data for key in ["age", "gender", "occupation"])
+                
+                # Only migrate if it's flat structure
+                if is_normalized(persona_data):
+                    # Already normalized by the current normalizer version
+                    pass
+                elif has_flat_demographics and not has_demographics:
+                    # Normalize to nested structure
+                    new_data = normalize_persona_to_nested(persona_data)
+                    logger.info(f"Migrated persona {persona_id}: {persona_name}")
+                elif has_demographics:
+                    # Already nested, but ensure it's fully normalized
+                    normalized_data = normalize_persona_to_nested(persona_data)
+                    # Only update if there were changes
+                    if normalized_data != persona_data:
+                        new_data = normalized_data
+                        logger.info(f"Normalized persona {persona_id}: {persona_name}")
+        except Exception as e:
+            logger.error(f"Error migrating persona {persona_id}: {e}", exc_info=True)
+            continue
+        
+        if new_data is not persona_data:
+            changed_count += 1
+        updates.append({
+            "id": persona_id,
+            **persona_data_columns(new_data),
+            "norm_version": NORMALIZER_VERSION
+        })
+    return updates, changed_count
+
+
+async def _collect_updates_in_pool(
+    pool: ProcessPoolExecutor,
+    rows: List[Tuple[int, str, Any]],
+    workers: int
+) -> Tuple[List[Dict[str, Any]], int]:
+    """Run _collect_updates over contiguous slices of a batch in the process pool."""
+    loop = asyncio.get_running_loop()
+    slice_size = -(-len(rows) // workers)  # ceil division
+    results = await asyncio.gather(*(
+        loop.run_in_executor(pool, _collect_updates, rows[i:i + slice_size])
+        for i in range(0, len(rows), slice_size)
+    ))
+    updates = [update_params for slice_updates, _ in results for update_params in slice_updates]
+    return updates, sum(changed_count for _, changed_count in results)
+
+
+async def migrate_all_personas_to_nested(batch_size: int = 1000, max_workers: Optional[int] = None):
     """
     Migrate all personas in the database to the standard nested structure.
     
-    This function:
-    1. Loads all personas from the database
-    2. Normalizes each persona to nested structure
-    3. Updates the persona_data in the database
+    Personas the normalizer would leave untouched (already stamped with the
+    current version, or without any demographic fields) are marked as checked
+    with one server-side UPDATE, without fetching them.
+    
+    The function then walks the remaining personas not yet checked by the current
+    normalizer version (norm_version is NULL or older, served by the norm_version
+    index) in primary-key order, batch_size rows at a time (keyset pagination, so memory
+    stays bounded), and for each batch:
+    1. Loads the id, name and persona_data of the personas
+    2. Normalizes each persona to nested structure in a process pool of
+       max_workers processes (default: CPU count), keeping the CPU-bound
+       normalization off the event loop
+    3. Writes back persona_data, norm_version and content_hash with a single
+       executemany UPDATE and commits
     """
+    workers = max_workers or os.cpu_count() or 1
+    # spawn: forked children would inherit the parent's event loop and DB connections
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
     async with AsyncSessionLocal() as session:
         try:
-            # Get all personas
-            result = await session.execute(select(Persona))
-            personas = result.scalars().all()
-            
-            logger.info(f"Found {len(personas)} personas to migrate")
-            
             migrated_count = 0
-            for persona in personas:
-                try:
-                    # Check if already in nested format (has demographics object)
-                    if isinstance(persona.persona_data, dict):
-                        has_demographics = "demographics" in persona.persona_data
-                        has_flat_demographics = any(key in persona.persona_data for key in ["age", "gender", "occupation"])
-                        
-                        # Only migrate if it's flat structure
-                        if has_flat_demographics and not has_demographics:
-                            # Normalize to nested structure
-                            normalized_data = normalize_persona_to_nested(persona.persona_data)
-                            persona.persona_data = normalized_data
-                            migrated_count += 1
-                            logger.info(f"Migrated persona {persona.id}: {persona.name}")
-                        elif has_demographics:
-                            # Already nested, but ensure it's fully normalized
-                            normalized_data = normalize_persona_to_nested(persona.persona_data)
-                            # Only update if there were changes
-                            if normalized_data != persona.persona_data:
-                                persona.persona_data = normalized_data
-                                migrated_count += 1
-                                logger.info(f"Normalized persona {persona.id}: {persona.name}")
-                except Exception as e:
-                    logger.error(f"Error migrating persona {persona.id}: {e}", exc_info=True)
-                    continue
+            processed_count = 0
+            last_id = 0
+            stale = or_(Persona.norm_version.is_(None), Persona.norm_version < NORMALIZER_VERSION)
             
+            persona_data = cast(Persona.persona_data, JSONB)
+            result = await session.execute(
+                update(Persona)
+                .where(
+                    stale,
+                    or_(
+                        persona_data.contains({NORMALIZER_VERSION_KEY: NORMALIZER_VERSION}),
+                        ~persona_data.has_any(array(["age", "gender", "occupation", "demographics"]))
+                    )
+                )
+                .values(norm_version=NORMALIZER_VERSION)
+                .execution_options(synchronize_session=False)
+            )
             await session.commit()
+            logger.info(f"Marked {result.rowcount} personas as normalized without rewriting them")
+            
+            while True:
+                # Next batch of personas (column-only, no ORM objects)
+                result = await session.execute(
+                    select(Persona.id, Persona.name, Persona.persona_data)
+                    .where(Persona.id > last_id, stale)
+                    .order_by(Persona.id)
+                    .limit(batch_size)
+                )
+                rows = [tuple(row) for row in result.all()]
+                if not rows:
+                    break
+                
+                updates, changed_count = await _collect_updates_in_pool(pool, rows, workers)
+                if updates:
+                    # Bulk UPDATE by primary key (one executemany round trip)
+                    await session.execute(update(Persona), updates)
+                await session.commit()
+                
+                migrated_count += changed_count
+                processed_count += len(rows)
+                last_id = rows[-1][0]
+                logger.info(f"Processed {processed_count} personas ({migrated_count} migrated/normalized so far)")
+            
             logger.info(f"Migration complete: {migrated_count} personas migrated/normalized")
             return migrated_count
             
@@ -65,6 +162,8 @@ async def migrate_all_personas_to_nested():
             await session.rollback()
             logger.error(f"Error during migration: {e}", exc_info=True)
             raise
+        finally:
+            pool.shutdown()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,30 @@
+"""
+Column values derived from persona data.
+
+Kept free of service/database imports so it can be used from worker processes.
+"""
+from typing import Dict, Any
+import hashlib
+import orjson
+
+from app.utils.persona_normalizer import get_normalizer_version
+
+
+def persona_data_hash(persona_data: Any) -> str:
+    """Stable content hash of persona data (key order independent)."""
+    return hashlib.blake2b(
+        orjson.dumps(persona_data, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS),
+        digest_size=16
+    ).hexdigest()
+
+
+def persona_data_columns(persona_data: Any) -> Dict[str, Any]:
+    """
+    Column values for storing persona data: the JSON blob plus the columns
+    materialized from it, so they can be filtered on without parsing the blob.
+    """
+    return {
+        "persona_data": persona_data,
+        "norm_version": get_normalizer_version(persona_data),
+        "content_hash": persona_data_hash(persona_data)
+    }
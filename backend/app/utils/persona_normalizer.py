@@ -3,12 +3,95 @@ Persona structure normalizer.
 
 This module provides functions to normalize persona structures to a standard nested format.
 All personas should follow this structure for consistency.
+
+Do not decorate these functions with numba.jit/njit: the work is string and dict
+manipulation, which Numba runs in object mode, slower than plain CPython.
 """
-from typing import Dict, Any, List, Optional
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 
+# Version of the normalized structure, stamped into normalized personas under
+# NORMALIZER_VERSION_KEY. Bump it whenever the output structure changes so that
+# stored personas are normalized again by the migration.
+NORMALIZER_VERSION = 1
+NORMALIZER_VERSION_KEY = "_norm_v"
+
+# Below this many personas, normalize_persona_set stays in-process: pool startup
+# and pickling personas to/from workers cost more than the normalization itself
+# (a few microseconds per persona)
+PARALLEL_NORMALIZE_THRESHOLD = 10000
+
+# Sentinel for single-lookup "key present?" checks (values may legitimately be None)
+_MISSING = object()
+
+# How each demographics field is resolved, in output order:
+# (key, alternate key, fallback key). The value is taken from the first of key /
+# alternate key present at the top level; otherwise from the nested demographics
+# dict (key, or alternate key if that is falsy); otherwise from the top-level
+# fallback key if present.
+_DEMOGRAPHIC_FIELDS: Tuple[Tuple[str, Optional[str], Optional[str]], ...] = (
+    ("age", None, None),
+    ("gender", None, None),
+    # Use nationality as location if location not available
+    ("location", None, "nationality"),
+    ("occupation", None, None),
+    ("education", "education_level", None),
+    ("nationality", None, None),
+    ("income_bracket", None, None),
+    ("relationship_status", None, None),
+)
+
+
+def is_normalized(persona_data: Any) -> bool:
+    """
+    Check whether persona data was stamped by the current normalizer version.
+    
+    Only for deciding which stored personas the migration can skip; the stamp
+    in arbitrary input (e.g. echoed back by the LLM) proves nothing.
+    """
+    return isinstance(persona_data, dict) and persona_data.get(NORMALIZER_VERSION_KEY) == NORMALIZER_VERSION
+
+
+def without_normalizer_version(persona_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Persona data without the normalizer version stamp (e.g. for LLM prompts)."""
+    if NORMALIZER_VERSION_KEY not in persona_data:
+        return persona_data
+    return {key: value for key, value in persona_data.items() if key != NORMALIZER_VERSION_KEY}
+
+
+def get_normalizer_version(persona_data: Any) -> Any:
+    """Normalizer version persona data was stamped with (an int), or None if it was never normalized."""
+    if not isinstance(persona_data, dict):
+        return None
+    return persona_data.get(NORMALIZER_VERSION_KEY)
+
+
+def _coerce_bullets(value: Any, split_sentences: bool = False) -> List[Any]:
+    """
+    Coerce a list-or-text field (goals, frustrations, ...) to a list.
+    
+    Lists are returned as-is; strings are split into non-empty, stripped lines;
+    anything else becomes an empty list. With split_sentences, a string that is a
+    single line is split on periods instead (keeping parts longer than 10 chars).
+    
+    Splits on "\n" and "." only (not str.splitlines() or smarter sentence
+    splitting), since changing the split rules would change stored personas.
+    """
+    if isinstance(value, list):
+        return value
+    if not isinstance(value, str):
+        return []
+    
+    items = [stripped for item in value.split("\n") if (stripped := item.strip())]
+    if split_sentences and len(items) == 1:
+        # If it's one long string, try splitting by periods
+        items = [stripped for item in value.split(".") if len(stripped := item.strip()) > 10]
+    return items
+
 
 def normalize_persona_to_nested(persona_data: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -44,16 +127,20 @@ def normalize_persona_to_nested(persona_data: Dict[str, Any]) -> Dict[str, Any]:
         } (optional),
         "quote": str (optional),
         "quotes": List[str] (optional),
-        "other_information": str (optional)
+        "other_information": str (optional),
+        "_norm_v": int (normalizer version)
     }
     
+    Always normalizes, whatever version stamp the input carries (the migration
+    skips stored personas stamped with the current version itself).
+    
     Args:
         persona_data: Persona data in any format (flat or nested)
         
     Returns:
         Normalized persona data in standard nested structure
     """
-    normalized = {}
+    normalized: Dict[str, Any] = {}
     
     # Handle persona_id
     normalized["persona_id"] = persona_data.get("persona_id")
@@ -65,60 +152,34 @@ def normalize_persona_to_nested(persona_data: Dict[str, Any]) -> Dict[str, Any]:
     normalized["tagline"] = persona_data.get("tagline") or persona_data.get("role")
     
     # Build demographics object
-    demographics = {}
-    
-    # Age
-    if "age" in persona_data:
-        demographics["age"] = persona_data["age"]
-    elif "demographics" in persona_data and isinstance(persona_data["demographics"], dict):
-        demographics["age"] = persona_data["demographics"].get("age")
-    
-    # Gender
-    if "gender" in persona_data:
-        demographics["gender"] = persona_data["gender"]
-    elif "demographics" in persona_data and isinstance(persona_data["demographics"], dict):
-        demographics["gender"] = persona_data["demographics"].get("gender")
-    
-    # Location
-    if "location" in persona_data:
-        demographics["location"] = persona_data["location"]
-    elif "demographics" in persona_data and isinstance(persona_data["demographics"], dict):
-        demographics["location"] = persona_data["demographics"].get("location")
-    elif "nationality" in persona_data:
-        # Use nationality as location if location not available
-        demographics["location"] = persona_data["nationality"]
-    
-    # Occupation
-    if "occupation" in persona_data:
-        demographics["occupation"] = persona_data["occupation"]
-    elif "demographics" in persona_data and isinstance(persona_data["demographics"], dict):
-        demographics["occupation"] = persona_data["demographics"].get("occupation")
-    
-    # Education
-    if "education" in persona_data:
-        demographics["education"] = persona_data["education"]
-    elif "education_level" in persona_data:
-        demographics["education"] = persona_data["education_level"]
-    elif "demographics" in persona_data and isinstance(persona_data["demographics"], dict):
-        demographics["education"] = persona_data["demographics"].get("education") or persona_data["demographics"].get("education_level")
-    
-    # Nationality
-    if "nationality" in persona_data:
-        demographics["nationality"] = persona_data["nationality"]
-    elif "demographics" in persona_data and isinstance(persona_data["demographics"], dict):
-        demographics["nationality"] = persona_data["demographics"].get("nationality")
-    
-    # Income bracket
-    if "income_bracket" in persona_data:
-        demographics["income_bracket"] = persona_data["income_bracket"]
-    elif "demographics" in persona_data and isinstance(persona_data["demographics"], dict):
-        demographics["income_bracket"] = persona_data["demographics"].get("income_bracket")
-    
-    # Relationship status
-    if "relationship_status" in persona_data:
-        demographics["relationship_status"] = persona_data["relationship_status"]
-    elif "demographics" in persona_data and isinstance(persona_data["demographics"], dict):
-        demographics["relationship_status"] = persona_data["demographics"].get("relationship_status")
+    demographics: Dict[str, Any] = {}
+    
+    # Nested demographics of the input, looked up once (only used if it is a dict)
+    source_demographics = persona_data.get("demographics")
+    if not isinstance(source_demographics, dict):
+        source_demographics = None
+    
+    for key, alternate_key, fallback_key in _DEMOGRAPHIC_FIELDS:
+        # A top-level key that is present wins, even if its value is None
+        value = persona_data.get(key, _MISSING)
+        if value is _MISSING and alternate_key is not None:
+            value = persona_data.get(alternate_key, _MISSING)
+        
+        if value is not _MISSING:
+            demographics[key] = value
+        elif source_demographics is not None:
+            value = source_demographics.get(key)
+            if not value and alternate_key is not None:
+                value = source_demographics.get(alternate_key)
+            demographics[key] = value
+        elif fallback_key is not None:
+            value = persona_data.get(fallback_key, _MISSING)
+            if value is not _MISSING:
+                demographics[key] = value
+    
+    # Social media usage
+    if "social_media_usage" in persona_data:
+        demographics["social_media_usage"] = persona_data["social_media_usage"]
     
     normalized["demographics"] = demographics
     
@@ -134,58 +195,29 @@ def normalize_persona_to_nested(persona_data: Dict[str, Any]) -> Dict[str, Any]:
     )
     
     # Goals - convert to array
-    goals = []
+    goals: List[Any] = []
     if "goals" in persona_data:
-        if isinstance(persona_data["goals"], list):
-            goals = persona_data["goals"]
-        elif isinstance(persona_data["goals"], str):
-            # Split by sentences or newlines if it's a string
-            goals = [g.strip() for g in persona_data["goals"].split("\n") if g.strip()]
-            if len(goals) == 1:
-                # If it's one long string, try splitting by periods
-                goals = [g.strip() for g in persona_data["goals"].split(".") if g.strip() and len(g.strip()) > 10]
+        goals = _coerce_bullets(persona_data["goals"], split_sentences=True)
     elif "goals_and_motivations" in persona_data and isinstance(persona_data["goals_and_motivations"], dict):
-        goals_data = persona_data["goals_and_motivations"].get("goals")
-        if isinstance(goals_data, list):
-            goals = goals_data
-        elif isinstance(goals_data, str):
-            goals = [g.strip() for g in goals_data.split("\n") if g.strip()]
+        goals = _coerce_bullets(persona_data["goals_and_motivations"].get("goals"))
     
     normalized["goals"] = goals if goals else []
     
-    # Frustrations - convert to array
-    frustrations = []
-    if "frustrations" in persona_data:
-        if isinstance(persona_data["frustrations"], list):
-            frustrations = persona_data["frustrations"]
-        elif isinstance(persona_data["frustrations"], str):
-            frustrations = [f.strip() for f in persona_data["frustrations"].split("\n") if f.strip()]
-    elif "pain_points" in persona_data:
-        if isinstance(persona_data["pain_points"], list):
-            frustrations = persona_data["pain_points"]
-        elif isinstance(persona_data["pain_points"], str):
-            frustrations = [f.strip() for f in persona_data["pain_points"].split("\n") if f.strip()]
-    elif "pain_points_and_frustrations" in persona_data:
-        if isinstance(persona_data["pain_points_and_frustrations"], list):
-            frustrations = persona_data["pain_points_and_frustrations"]
-        elif isinstance(persona_data["pain_points_and_frustrations"], str):
-            frustrations = [f.strip() for f in persona_data["pain_points_and_frustrations"].split("\n") if f.strip()]
+    # Frustrations - convert to array (first of the known keys present)
+    frustrations: List[Any] = []
+    for key in ("frustrations", "pain_points", "pain_points_and_frustrations"):
+        if key in persona_data:
+            frustrations = _coerce_bullets(persona_data[key])
+            break
     
     normalized["frustrations"] = frustrations if frustrations else []
     
     # Motivations - convert to array
-    motivations = []
+    motivations: List[Any] = []
     if "motivations" in persona_data:
-        if isinstance(persona_data["motivations"], list):
-            motivations = persona_data["motivations"]
-        elif isinstance(persona_data["motivations"], str):
-            motivations = [m.strip() for m in persona_data["motivations"].split("\n") if m.strip()]
+        motivations = _coerce_bullets(persona_data["motivations"])
     elif "goals_and_motivations" in persona_data and isinstance(persona_data["goals_and_motivations"], dict):
-        motivations_data = persona_data["goals_and_motivations"].get("motivations")
-        if isinstance(motivations_data, list):
-            motivations = motivations_data
-        elif isinstance(motivations_data, str):
-            motivations = [m.strip() for m in motivations_data.split("\n") if m.strip()]
+        motivations = _coerce_bullets(persona_data["goals_and_motivations"].get("motivations"))
     
     if motivations:
         normalized["motivations"] = motivations
@@ -201,7 +233,7 @@ def normalize_persona_to_nested(persona_data: Dict[str, Any]) -> Dict[str, Any]:
         normalized["technology_profile"] = persona_data["technology_profile"]
     elif "technology_usage" in persona_data or "digital_literacy" in persona_data:
         # Build technology profile from flat fields
-        tech_profile = {}
+        tech_profile: Dict[str, Any] = {}
         if "technology_usage" in persona_data:
             tech_profile["primary_devices"] = (
                 persona_data["technology_usage"] if isinstance(persona_data["technology_usage"], list)
@@ -222,23 +254,33 @@ def normalize_persona_to_nested(persona_data: Dict[str, Any]) -> Dict[str, Any]:
     if "other_information" in persona_data:
         normalized["other_information"] = persona_data["other_information"]
     
-    # Social media usage
-    if "social_media_usage" in persona_data:
-        if "demographics" not in normalized:
-            normalized["demographics"] = {}
-        normalized["demographics"]["social_media_usage"] = persona_data["social_media_usage"]
+    normalized[NORMALIZER_VERSION_KEY] = NORMALIZER_VERSION
     
     return normalized
 
 
-def normalize_persona_set(personas: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def normalize_persona_set(
+    personas: List[Dict[str, Any]],
+    max_workers: Optional[int] = None
+) -> List[Dict[str, Any]]:
     """
     Normalize a list of personas to the standard nested structure.
     
+    Sets of at least PARALLEL_NORMALIZE_THRESHOLD personas are normalized in a
+    process pool (normalization is pure-Python CPU work, so threads wouldn't help);
+    smaller sets are normalized in-process.
+    
     Args:
         personas: List of persona data dictionaries
+        max_workers: Process pool size (defaults to the CPU count)
         
     Returns:
-        List of normalized persona data dictionaries
+        List of normalized persona data dictionaries (in input order)
     """
-    return [normalize_persona_to_nested(persona) for persona in personas]
+    workers = max_workers or os.cpu_count() or 1
+    if len(personas) < PARALLEL_NORMALIZE_THRESHOLD or workers < 2:
+        return [normalize_persona_to_nested(persona) for persona in personas]
+    
+    chunksize = max(1, len(personas) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(normalize_persona_to_nested, personas, chunksize=chunksize))
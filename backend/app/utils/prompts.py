@@ -14,6 +14,15 @@ PERSONA SET GENERATION PROMPTS
 ═══════════════════════════════════════════════════════════════════════════════
 """
 
+__all__ = [
+    "PERSONA_SET_GENERATION_SYSTEM_PROMPT",
+    "PERSONA_SET_GENERATION_PROMPT_TEMPLATE",
+    "PERSONA_SET_GENERATION_INTERVIEWS_ONLY_TEMPLATE",
+    "PERSONA_SET_GENERATION_CONTEXT_ONLY_TEMPLATE",
+    "PERSONA_EXPANSION_SYSTEM_PROMPT",
+    "PERSONA_EXPANSION_PROMPT_TEMPLATE",
+]
+
 # System prompt for persona set generation
 # This sets the role and behavior of the AI when generating persona sets
 # You can customize this to change how the AI approaches persona generation
@@ -110,19 +119,17 @@ PERSONA_EXPANSION_SYSTEM_PROMPT = """You are an expert at expanding basic person
 #   - {context}: The context documents combined into a single string
 #   - {persona_basic}: The basic persona data in JSON format
 #
+# Keep the fixed instructions first and the placeholders at the end (context
+# before persona): the provider's prompt cache only reuses an identical prefix,
+# so anything that varies per call should come as late as possible.
+#
 # Example usage:
 #   - Add your own instructions
 #   - Modify the structure
 #   - Add specific fields you want
 #   - Change the output format requirements
 #
-PERSONA_EXPANSION_PROMPT_TEMPLATE = """Expand the following basic persona into a comprehensive, detailed persona profile.
-
-Context Information:
-{context}
-
-Basic Persona:
-{persona_basic}
+PERSONA_EXPANSION_PROMPT_TEMPLATE = """Expand the basic persona given at the end into a comprehensive, detailed persona profile.
 
 CRITICAL RULES - YOU MUST FOLLOW THESE STRICTLY:
 
@@ -174,4 +181,10 @@ Return the expanded persona as a JSON object that:
 - Has goals and frustrations as arrays
 - Keeps ALL demographic fields EXACTLY as they are (no changes)
 - Only expands behavioral/psychographic fields (behaviors, goals, motivations, quotes, etc.)
-- Does NOT add new fields or information"""
+- Does NOT add new fields or information
+
+Context Information:
+{context}
+
+Basic Persona:
+{persona_basic}"""
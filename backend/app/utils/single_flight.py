@@ -0,0 +1,34 @@
+"""
+Per-key asyncio locks for coalescing concurrent identical work.
+"""
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Hashable
+import asyncio
+
+
+class SingleFlight:
+    """
+    Serializes work per key, so that concurrent callers with the same key run
+    one after the other (and can find what the first one did) instead of racing.
+    
+    Locks are dropped once nobody holds or waits for them. Not thread-safe;
+    intended for use from the event loop only.
+    """
+    
+    def __init__(self):
+        # Lock and number of users (holder plus waiters) per key
+        self._locks: Dict[Hashable, list] = {}
+    
+    @asynccontextmanager
+    async def __call__(self, key: Hashable) -> AsyncIterator[None]:
+        entry = self._locks.get(key)
+        if entry is None:
+            entry = self._locks[key] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._locks[key]
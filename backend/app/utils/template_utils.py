@@ -0,0 +1,39 @@
+"""
+Pre-parsed str.format templates for prompts rendered on every request.
+"""
+from string import Formatter
+from typing import Callable, List, Optional, Tuple
+
+
+def compile_template(template: str) -> Callable[..., str]:
+    """
+    Parse a str.format template once and return a render function.
+    
+    The render function produces the same string as template.format(**kwargs)
+    but joins the pre-parsed literal text and field values directly, instead of
+    re-parsing the template on every call. Templates using attribute/index
+    access, conversions or format specs fall back to template.format.
+    
+    Args:
+        template: Template with {name} placeholders ({{ and }} for literal braces)
+    
+    Returns:
+        Function taking the placeholder values as keyword arguments
+    """
+    parts: List[Tuple[str, Optional[str]]] = []
+    for literal_text, field_name, format_spec, conversion in Formatter().parse(template):
+        if field_name is not None and (
+            not field_name.isidentifier() or format_spec or conversion
+        ):
+            return lambda **kwargs: template.format(**kwargs)
+        parts.append((literal_text, field_name))
+    
+    def render(**kwargs) -> str:
+        pieces = []
+        for literal_text, field_name in parts:
+            pieces.append(literal_text)
+            if field_name is not None:
+                pieces.append(format(kwargs[field_name]))
+        return "".join(pieces)
+    
+    return render